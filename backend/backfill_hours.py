@@ -0,0 +1,73 @@
+"""
+回填 leave_records.total_hours。
+
+按主键分批读取尚未计算工时的记录，每批一次查询取得相关员工班表，
+再以 executemany 批量写回，适合对大量历史记录执行。
+
+用法:
+    python backfill_hours.py [--batch-size 5000] [--all]
+"""
+import argparse
+import time
+
+from sqlalchemy import or_, select, update
+
+from database import SessionLocal
+from models import Employee, LeaveRecord
+from work_calendar import work_calendar
+from work_hours import make_shift, leave_hours
+
+
+def backfill(batch_size: int = 5000, recompute_all: bool = False) -> int:
+    db = SessionLocal()
+    updated = 0
+    last_id = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            query = (
+                select(LeaveRecord.id, LeaveRecord.emp_id, LeaveRecord.start_datetime, LeaveRecord.end_datetime)
+                .where(LeaveRecord.id > last_id)
+                .order_by(LeaveRecord.id)
+                .limit(batch_size)
+            )
+            if not recompute_all:
+                query = query.where(or_(LeaveRecord.total_hours.is_(None), LeaveRecord.total_hours == 0))
+            rows = db.execute(query).all()
+            if not rows:
+                break
+
+            emp_ids = {row.emp_id for row in rows}
+            shifts = {
+                emp_id: make_shift(work_start, work_end)
+                for emp_id, work_start, work_end in db.execute(
+                    select(Employee.emp_id, Employee.work_start_time, Employee.work_end_time)
+                    .where(Employee.emp_id.in_(emp_ids))
+                )
+            }
+            default_shift = make_shift()
+
+            params = [
+                {"id": row.id,
+                 "total_hours": leave_hours(row.start_datetime, row.end_datetime,
+                                            shifts.get(row.emp_id, default_shift), work_calendar)}
+                for row in rows
+            ]
+            db.execute(update(LeaveRecord), params)
+            db.commit()
+
+            updated += len(params)
+            last_id = rows[-1].id
+            elapsed = time.perf_counter() - started
+            print(f"updated {updated} rows ({updated / elapsed:.0f} rows/s)")
+    finally:
+        db.close()
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill leave_records.total_hours")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--all", action="store_true", help="重新计算所有记录，而不只是尚未计算的记录")
+    args = parser.parse_args()
+    print(f"done, {backfill(args.batch_size, args.all)} rows updated")
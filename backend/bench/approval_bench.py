@@ -0,0 +1,142 @@
+"""
+批量审核基准：灌入一位主管（两层下属）的大量待审核请假，通过 POST /leave/leave-records/decisions
+一次核准/驳回全部记录，并与逐笔 ORM 更新的做法比较耗时，同时核对余额账本。
+
+运行:
+    cd backend && python -m bench.approval_bench --records 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def seed(engine, records: int, employees: int):
+    from sqlalchemy import insert
+    from models import Employee, EmployeeSupervisor, LeaveEntitlement, LeaveRecord
+
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{"emp_id": "BOSS", "name": "主管", "email": "boss@example.com",
+                                         "login_password": "x"}] + [
+            {"emp_id": f"E{i:05d}", "name": f"員工{i}", "email": f"e{i}@example.com", "login_password": "x"}
+            for i in range(employees)
+        ])
+        # 前 10% 为组长，直属 BOSS；其余员工挂在组长之下（第二层）
+        leads = max(1, employees // 10)
+        conn.execute(insert(EmployeeSupervisor), [
+            {"emp_id": f"E{i:05d}", "supervisor_id": "BOSS" if i < leads else f"E{i % leads:05d}"}
+            for i in range(employees)
+        ])
+        conn.execute(insert(LeaveEntitlement), [
+            {"emp_id": f"E{i:05d}", "leave_type": "特休", "entitlement_days": 365} for i in range(employees)
+        ])
+        base = datetime(2024, 1, 2, 9, 30)
+        conn.execute(insert(LeaveRecord), [
+            {"emp_id": f"E{rng.randrange(employees):05d}", "leave_type": "特休",
+             "start_datetime": base + timedelta(days=i % 300), "end_datetime": base + timedelta(days=i % 300, hours=9),
+             "status": "requested", "total_hours": Decimal("8.00")}
+            for i in range(records)
+        ])
+
+
+def per_record(db, supervisor_id: str, decisions):
+    """对照组：逐笔读取、检查并更新"""
+    from leave_approval import DECISION_STATUS
+    from leave_balance import apply_status_change
+    from models import LeaveRecord
+    from org_chart import org_chart
+
+    for leave_id, decision in decisions:
+        record = db.get(LeaveRecord, leave_id)
+        if record is None or record.status != "requested" or not org_chart.is_subordinate(supervisor_id, record.emp_id):
+            continue
+        record.status = DECISION_STATUS[decision]
+        apply_status_change(db, record, "requested", record.status)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--employees", type=int, default=500)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'approval.db')}"
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.orm import sessionmaker
+
+    from database import Base, SessionLocal, engine
+    from leave_balance import rebuild_balances
+    from models import LeaveBalance, LeaveRecord
+    from routers import leave
+    from utils import create_access_token
+
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.records, args.employees)
+    with SessionLocal() as db:
+        rebuild_balances(db)
+        db.commit()
+        ids = [leave_id for (leave_id,) in db.execute(select(LeaveRecord.id))]
+
+    rng = random.Random(7)
+    decisions = [(leave_id, rng.choice(["approve", "approve", "approve", "reject"])) for leave_id in ids]
+    payload = {"decisions": [{"leave_id": leave_id, "decision": d} for leave_id, d in decisions]
+               + [{"leave_id": 10 ** 9, "decision": "approve"}]}  # 一笔不存在的记录
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'BOSS', 'emp_id': 'BOSS'})}"}
+
+    # 对照组在复制出的数据库上执行，两边起点相同
+    baseline_path = os.path.join(tmp, "approval_baseline.db")
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"VACUUM INTO '{baseline_path}'")
+
+    app = FastAPI()
+    app.include_router(leave.router, prefix="/leave")
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        response = client.post("/leave/leave-records/decisions", json=payload, headers=headers)
+        batch_s = time.perf_counter() - start
+    body = response.json()
+
+    baseline_engine = create_engine(f"sqlite:///{baseline_path}")
+    with sessionmaker(bind=baseline_engine)() as db:
+        start = time.perf_counter()
+        per_record(db, "BOSS", decisions)
+        per_record_s = time.perf_counter() - start
+
+    def totals(bind):
+        with bind.connect() as conn:
+            return [str(v) for v in conn.execute(
+                select(func.sum(LeaveBalance.used_hours), func.sum(LeaveBalance.pending_hours))).one()]
+
+    result = {
+        "records": args.records,
+        "status_code": response.status_code,
+        "approved": body.get("approved"),
+        "rejected": body.get("rejected"),
+        "failed": body.get("failed"),
+        "batch_s": round(batch_s, 3),
+        "per_record_s": round(per_record_s, 3),
+        "speedup": round(per_record_s / batch_s, 1) if batch_s else None,
+        "balances_batch": totals(engine),
+        "balances_per_record": totals(baseline_engine),
+    }
+    result["balances_match"] = result["balances_batch"] == result["balances_per_record"]
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
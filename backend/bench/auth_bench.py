@@ -0,0 +1,98 @@
+"""
+认证开销微基准：比较每次请求都验证 JWT 签名与使用 claims 缓存时的单次开销，
+并经由 ASGI 量测带 token 的 REST 请求相对于不带 token 的额外延迟。
+
+运行:
+    cd backend && python -m bench.auth_bench --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import APIRouter, Depends, FastAPI  # noqa: E402
+from jose import jwt  # noqa: E402
+
+import utils  # noqa: E402
+
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+async def request_us(app: FastAPI, headers: dict, iterations: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/ping", headers=headers)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            response = await client.get("/ping", headers=headers)
+            assert response.status_code == 200, response.text
+        return round((time.perf_counter() - start) / iterations * 1e6, 1)
+
+
+def build_app() -> FastAPI:
+    router = APIRouter()
+
+    @router.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router, dependencies=[Depends(utils.get_token_claims)])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    token = utils.create_access_token({"sub": "E00001", "emp_id": "E00001"})
+    utils.token_cache.clear()
+    utils.verify_access_token(token)
+
+    results = {
+        "algorithm": utils.ALGORITHM,
+        "create_token_us": per_call_us(lambda: utils.create_access_token({"emp_id": "E00001"}), args.iterations),
+        "decode_uncached_us": per_call_us(
+            lambda: jwt.decode(token, utils.SECRET_KEY, algorithms=[utils.ALGORITHM]), args.iterations),
+        "verify_cached_us": per_call_us(lambda: utils.verify_access_token(token), args.iterations),
+    }
+
+    # 三种情形交替跑多轮取最小值，降低 ASGI 调度本身的抖动
+    app = build_app()
+    headers = {"Authorization": f"Bearer {token}"}
+    cache_size = utils.token_cache.max_size
+    no_auth = cached = uncached = float("inf")
+    for _ in range(args.rounds):
+        no_auth = min(no_auth, asyncio.run(request_us(app, {}, args.requests)))
+        utils.token_cache.max_size = cache_size
+        cached = min(cached, asyncio.run(request_us(app, headers, args.requests)))
+        utils.token_cache.max_size = 0  # 关闭缓存：每次都验证签名
+        utils.token_cache.clear()
+        uncached = min(uncached, asyncio.run(request_us(app, headers, args.requests)))
+    results.update({
+        "request_no_token_us": no_auth,
+        "request_token_cached_us": cached,
+        "request_token_uncached_us": uncached,
+        "auth_overhead_cached_us": round(cached - no_auth, 1),
+        "auth_overhead_uncached_us": round(uncached - no_auth, 1),
+        "cache_hits": utils.token_cache.hits,
+        "cache_misses": utils.token_cache.misses,
+    })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+规则解析器基准：统计语料命中率、准确率与单次解析耗时。
+
+运行:
+    cd backend && python -m bench.leave_parser_bench
+"""
+import json
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from leave_parser import parse_leave_request  # noqa: E402
+
+TODAY = date(2025, 3, 12)  # 固定为星期三，保证结果可复现
+
+# (输入, 期望结果)；期望为 None 表示应交给 LLM
+CORPUS = [
+    ("@@E001@@明天下午請病假", ("病假", "2025-03-13 13:30", "2025-03-13 18:30")),
+    ("明天上午請事假", ("事假", "2025-03-13 09:30", "2025-03-13 12:30")),
+    ("後天整天特休", ("特休", "2025-03-14 09:30", "2025-03-14 18:30")),
+    ("這周五下午補休", ("補休", "2025-03-14 13:30", "2025-03-14 18:30")),
+    ("下週一整天特休", ("特休", "2025-03-17 09:30", "2025-03-17 18:30")),
+    ("下周二上午请病假", ("病假", "2025-03-18 09:30", "2025-03-18 12:30")),
+    ("星期五全天年假", ("特休", "2025-03-14 09:30", "2025-03-14 18:30")),
+    ("3月20日到3月21日整天特休", ("特休", "2025-03-20 09:30", "2025-03-21 18:30")),
+    ("2025-04-01 09:30 到 2025-04-01 12:00 事假", ("事假", "2025-04-01 09:30", "2025-04-01 12:00")),
+    ("2025/04/02 10:00~2025/04/03 15:00 病假", ("病假", "2025-04-02 10:00", "2025-04-03 15:00")),
+    ("明天下午3點到5點半請事假", ("事假", "2025-03-13 15:00", "2025-03-13 17:30")),
+    ("明天下午到後天上午病假", ("病假", "2025-03-13 13:30", "2025-03-14 12:30")),
+    ("4/7 一整天 喪假", ("喪假", "2025-04-07 09:30", "2025-04-07 18:30")),
+    ("大後天早上請公假", ("公假", "2025-03-15 09:30", "2025-03-15 12:30")),
+    ("今天下午生理假", ("生理假", "2025-03-12 13:30", "2025-03-12 18:30")),
+    ("我想請假", None),
+    ("明天請病假", None),
+    ("明天還是後天請病假？", None),
+    ("下週一到下週三特休", None),
+    ("明天下午不請假了", None),
+    ("幫我請三天假", None),
+    ("明天下午請病假和事假", None),
+    ("明天9點請特休", None),
+    ("明天下午兩點請病假", None),
+    ("明天下午三點到五點請病假", None),
+    ("後天下午四點半前請事假", None),
+    ("明天下午請病假2小時", None),
+    ("明天下午請病假 後天上午也要", None),
+]
+
+
+def main(rounds: int = 2000):
+    hits = correct = false_hits = 0
+    for text, expected in CORPUS:
+        result = parse_leave_request(text, today=TODAY)
+        actual = None if result is None else (result["leave_type"], result["start_datetime"], result["end_datetime"])
+        if actual is not None:
+            hits += 1
+            if actual == expected:
+                correct += 1
+            else:
+                false_hits += 1
+                print(f"MISMATCH {text!r}: {actual} != {expected}", file=sys.stderr)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text, _ in CORPUS:
+            parse_leave_request(text, today=TODAY)
+    elapsed = time.perf_counter() - started
+
+    expected_hits = sum(1 for _, expected in CORPUS if expected is not None)
+    print(json.dumps({
+        "corpus_size": len(CORPUS),
+        "hit_rate": round(hits / len(CORPUS), 3),
+        "recall": round(correct / expected_hits, 3),
+        "false_hits": false_hits,
+        "avg_latency_us": round(elapsed / (rounds * len(CORPUS)) * 1e6, 2),
+    }))
+
+
+if __name__ == "__main__":
+    main()
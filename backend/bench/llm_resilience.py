@@ -0,0 +1,146 @@
+"""
+LLM 限流与熔断测试：在本进程启动 openai_stub，并在运行中注入故障，依序检查
+1. 单一用户连续调用：超过令牌桶容量的调用被拒绝（throttled_user）
+2. 大量用户同时调用：超过全局令牌桶的调用被拒绝（throttled_global）
+3. 上游全部失败：连续失败达门槛后熔断，其后的调用立即短路而不必等待超时
+4. 熔断期间的请假摘要改为直接列出记录
+5. 上游恢复：经过 reset 秒后放行一个试探请求，成功即恢复
+
+运行:
+    cd backend && python -m bench.llm_resilience --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_stub(port: int):
+    import uvicorn
+
+    from bench.openai_stub import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def _timed_calls(llm, users: list) -> dict:
+    """依序调用，按结果分类并记录各类的平均耗时"""
+    outcomes = {}
+    for user in users:
+        start = time.perf_counter()
+        try:
+            await llm.chat_completion([{"role": "user", "content": "hi"}], user=user)
+            kind = "ok"
+        except llm.LLMRateLimited:
+            kind = "throttled"
+        except llm.LLMUnavailable:
+            kind = "short_circuited"
+        except llm.LLMError:
+            kind = "failed"
+        bucket = outcomes.setdefault(kind, [])
+        bucket.append(time.perf_counter() - start)
+    return {kind: {"count": len(times), "mean_ms": round(sum(times) / len(times) * 1000, 2)}
+            for kind, times in outcomes.items()}
+
+
+async def run(args) -> dict:
+    import llm
+    from bench import openai_stub
+    from rate_limit import KeyedRateLimiter
+    from routers import websocket
+
+    def reset_limiters(user_rate, user_burst, global_rate, global_burst):
+        llm.user_limiter = KeyedRateLimiter(user_rate, user_burst)
+        llm.global_limiter = KeyedRateLimiter(global_rate, global_burst, max_keys=1)
+
+    openai_stub.faults.update(latency_ms=args.latency_ms, failure_rate=0)
+    result = {}
+
+    # 1. 单一用户连续调用
+    reset_limiters(llm.LLM_USER_RATE, llm.LLM_USER_BURST, 1000, 1000)
+    result["single_user_burst"] = await _timed_calls(llm, ["E0001"] * args.calls)
+
+    # 2. 大量用户同时调用
+    reset_limiters(1000, 1000, llm.LLM_GLOBAL_RATE, llm.LLM_GLOBAL_BURST)
+    outcomes = await asyncio.gather(*[_timed_calls(llm, [f"E{i:04d}"]) for i in range(args.calls * 4)])
+    result["many_users_burst"] = {
+        kind: sum(o[kind]["count"] for o in outcomes if kind in o) for kind in ("ok", "throttled")
+    }
+
+    # 3. 上游故障
+    reset_limiters(1000, 1000, 1000, 1000)
+    openai_stub.faults.update(failure_rate=1.0)
+    result["outage"] = await _timed_calls(llm, [f"E{i:04d}" for i in range(args.calls)])
+    result["breaker_after_outage"] = llm.breaker.stats()
+
+    # 4. 熔断期间的摘要
+    records = [SimpleNamespace(id=1, leave_type="病", start_datetime="2024-03-05 13:30",
+                               end_datetime="2024-03-05 18:30", status="requested", total_hours=5)]
+    summary = await websocket.generate_leave_summary("E0001", records)
+    result["summary_while_open"] = summary
+
+    # 5. 上游恢复
+    openai_stub.faults.update(failure_rate=0)
+    await asyncio.sleep(llm.breaker.reset_seconds)
+    result["recovery"] = await _timed_calls(llm, [f"E{i:04d}" for i in range(3)])
+    result["breaker_after_recovery"] = llm.breaker.stats()
+    result["stub"] = dict(openai_stub.stats)
+
+    breaker_ok = (
+        result["breaker_after_outage"]["state"] == "open"
+        and result["outage"].get("short_circuited", {}).get("count", 0) > 0
+        and result["breaker_after_recovery"]["state"] == "closed"
+    )
+    result["passed"] = bool(
+        result["single_user_burst"].get("throttled")
+        and result["many_users_burst"]["throttled"] > 0
+        and breaker_ok
+        and summary.startswith("病假")
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=50, help="stub 的回应延迟")
+    args = parser.parse_args()
+
+    port = _free_port()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'llm.db')}")
+    os.environ.setdefault("LLM_BREAKER_FAILURES", "5")
+    os.environ.setdefault("LLM_BREAKER_RESET_SECONDS", "1")
+
+    server = _start_stub(port)
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        server.should_exit = True
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+登录吞吐基准：模拟早上集中登录，比较 bcrypt 在线程池内联执行与交由进程池执行时
+/auth/login 的吞吐量与延迟分布。
+
+运行:
+    cd backend && python -m bench.login_bench --users 200 --concurrency 50 --rounds 12
+    python -m bench.login_bench --mode pool --workers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import utils  # noqa: E402
+from database import Base, get_async_db  # noqa: E402
+from models import Employee  # noqa: E402
+from routers import auth  # noqa: E402
+
+
+def build_app(db_path: str, users: int) -> FastAPI:
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    password_hash = utils.hash_password("secret")
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {"emp_id": f"E{i:05d}", "name": f"員工{i}", "email": f"e{i}@example.com", "login_password": password_hash}
+            for i in range(users)
+        ])
+    session_factory = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[get_async_db] = bench_db
+    return app
+
+
+async def _inline_verify(plain_password, hashed_password):
+    # 改动前的行为：bcrypt 在 FastAPI 线程池中执行，受 GIL 与线程池大小限制
+    return await run_in_threadpool(utils.verify_and_update_password, plain_password, hashed_password)
+
+
+async def run(app: FastAPI, users: int, concurrency: int, requests: int) -> dict:
+    latencies, statuses = [], {}
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"e{i % users}@example.com")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                email = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.post("/auth/login", data={"email": email, "password": "secret"})
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pick = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000, 1)  # noqa: E731
+    return {
+        "requests": requests,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    args = parser.parse_args()
+
+    # 基准只测哈希吞吐，放宽登录限流
+    auth.email_limiter.rate = auth.email_limiter.capacity = 1e9
+    auth.ip_limiter.rate = auth.ip_limiter.capacity = 1e9
+
+    results = {"bcrypt_rounds": utils.BCRYPT_ROUNDS, "workers": utils.PASSWORD_HASH_WORKERS,
+               "cpu_count": os.cpu_count()}
+    pooled_verify = auth.verify_and_update_password_async
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "login_bench.db"), args.users)
+        modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+        for mode in modes:
+            auth.verify_and_update_password_async = _inline_verify if mode == "inline" else pooled_verify
+            if mode == "pool":
+                # 预热进程池，避免把进程启动时间算进去
+                asyncio.run(utils.hash_password_async("warmup"))
+            results[mode] = asyncio.run(run(app, args.users, args.concurrency, args.requests))
+    utils.shutdown_hash_pool()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
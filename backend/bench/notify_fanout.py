@@ -0,0 +1,129 @@
+"""
+推送扇出测试：模拟大量已登记的 WebSocket 连线（每条连线一个消费任务），
+从线程池发布请假事件（与同步路由相同的调用方式），量测从 publish 到各连线取得事件的延迟，
+并比较不同连线总数下单次 publish 的耗时，确认投递成本只与收件人的连线数有关。
+
+运行:
+    cd backend && python -m bench.notify_fanout --sockets 1000,5000,20000 --events 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _summary(latencies: list) -> dict:
+    ms = [v * 1000 for v in latencies]
+    return {
+        "count": len(ms),
+        "p50_ms": round(_percentile(ms, 0.50), 3),
+        "p95_ms": round(_percentile(ms, 0.95), 3),
+        "p99_ms": round(_percentile(ms, 0.99), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+
+async def run_case(sockets: int, events: int, recipients: int, tabs: int, interval: float) -> dict:
+    from notifications import MemoryPubSub, Notifier
+
+    notifier = Notifier(MemoryPubSub())
+    await notifier.start()
+
+    employees = [f"E{i:06d}" for i in range(max(1, sockets // tabs))]
+    latencies = []
+    expected = 0
+    done = asyncio.Event()
+
+    async def consume(subscriber):
+        # 模拟一条连线：取出事件即视为已发送给客户端
+        while True:
+            event = await subscriber.get()
+            latencies.append(time.perf_counter() - event["sent_at"])
+            if len(latencies) >= expected:
+                done.set()
+
+    subscribers = [notifier.registry.register(employees[i % len(employees)]) for i in range(sockets)]
+    consumers = [asyncio.create_task(consume(s)) for s in subscribers]
+    connections_per_employee = sockets / len(employees)
+
+    # 每个事件发给随机 recipients 位员工（例如申请人的各级主管）
+    targets = [random.sample(employees, min(recipients, len(employees))) for _ in range(events)]
+    expected = sum(len(notifier.registry._connections[e]) for t in targets for e in t)
+
+    publish_times = []
+
+    def publish_all():
+        # 按固定间隔发布，量测的是单个事件的投递延迟而不是积压
+        for recipients_list in targets:
+            start = time.perf_counter()
+            notifier.publish(recipients_list, {"event": "leave_requested", "sent_at": start})
+            publish_times.append(time.perf_counter() - start)
+            time.sleep(interval)
+
+    started = time.perf_counter()
+    await asyncio.to_thread(publish_all)
+    await asyncio.wait_for(done.wait(), timeout=60)
+    elapsed = time.perf_counter() - started
+
+    # 最坏情况：一个事件发给所有员工
+    latencies_targeted = latencies[:]
+    latencies.clear()
+    expected = sockets
+    done.clear()
+    start = time.perf_counter()
+    notifier.publish(employees, {"event": "broadcast", "sent_at": start})
+    await asyncio.wait_for(done.wait(), timeout=60)
+    broadcast_ms = (time.perf_counter() - start) * 1000
+
+    for task in consumers:
+        task.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    await notifier.close()
+
+    return {
+        "sockets": sockets,
+        "employees": len(employees),
+        "connections_per_employee": round(connections_per_employee, 2),
+        "events": events,
+        "deliveries": len(latencies_targeted),
+        "elapsed_s": round(elapsed, 3),
+        "publish_us_mean": round(statistics.mean(publish_times) * 1e6, 2),
+        "latency": _summary(latencies_targeted),
+        "broadcast_all_ms": round(broadcast_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", default="1000,5000,20000", help="逗号分隔的连线总数")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--recipients", type=int, default=3, help="每个事件的收件员工数")
+    parser.add_argument("--tabs", type=int, default=2, help="每位员工平均开启的连线数")
+    parser.add_argument("--interval-ms", type=float, default=1.0, help="两次发布之间的间隔")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # notifications 经由 org_chart 导入 database，避免连接默认的 MySQL
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'notify.db')}")
+    random.seed(args.seed)
+
+    cases = [asyncio.run(run_case(int(n), args.events, args.recipients, args.tabs, args.interval_ms / 1000))
+             for n in args.sockets.split(",")]
+    print(json.dumps({"recipients_per_event": args.recipients, "cases": cases}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
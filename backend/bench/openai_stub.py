@@ -0,0 +1,108 @@
+"""
+本地 OpenAI 兼容 stub 服务，用于在不调用真实 API 的情况下测试 LLM 调用链路。
+
+启动:
+    STUB_LATENCY_MS=2000 uvicorn bench.openai_stub:app --port 39300
+后端指向 stub:
+    OPENAI_BASE_URL=http://127.0.0.1:39300/v1
+故障注入（也可在运行中以 POST /stub/faults 调整，例如 {"failure_rate": 1.0} 或 {"latency_ms": 40000}）:
+    STUB_FAILURE_RATE=0.5 uvicorn bench.openai_stub:app --port 39300
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_LATENCY_MS = int(os.getenv("STUB_LATENCY_MS", "1000"))  # 人为延迟（毫秒）
+STUB_CHUNK_SIZE = int(os.getenv("STUB_CHUNK_SIZE", "4"))  # 流式模式下每个 chunk 的字数
+STUB_FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", "0"))  # 返回错误的比例（0~1）
+STUB_FAILURE_STATUS = int(os.getenv("STUB_FAILURE_STATUS", "503"))
+
+# 运行中可调整的故障参数
+faults = {
+    "latency_ms": STUB_LATENCY_MS,
+    "failure_rate": STUB_FAILURE_RATE,
+    "failure_status": STUB_FAILURE_STATUS,
+}
+stats = {"requests": 0, "failed": 0}
+
+app = FastAPI(title="OpenAI Stub")
+
+
+def build_reply(messages: list) -> str:
+    """根据请求内容生成固定的回复，请假提取请求返回 JSON，其余返回摘要文本"""
+    system = messages[0]["content"] if messages else ""
+    if "請假助理" in system:
+        day = (datetime.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+        return json.dumps({
+            "leave_type": "病假",
+            "start_datetime": f"{day} 13:30",
+            "end_datetime": f"{day} 18:30",
+        }, ensure_ascii=False)
+    return "以下是您的請假記錄摘要。"
+
+
+async def stream_reply(content: str, model: str):
+    """按 SSE 格式逐段返回内容，总延迟均摊到每个 chunk"""
+    chunks = [content[i:i + STUB_CHUNK_SIZE] for i in range(0, len(content), STUB_CHUNK_SIZE)]
+    delay = faults["latency_ms"] / 1000 / max(len(chunks), 1)
+    for i, text in enumerate(chunks):
+        await asyncio.sleep(delay)
+        payload = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "delta": {"role": "assistant", "content": text} if i == 0 else {"content": text},
+                "finish_reason": "stop" if i == len(chunks) - 1 else None,
+            }],
+        }
+        yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    if random.random() < faults["failure_rate"]:
+        stats["failed"] += 1
+        await asyncio.sleep(faults["latency_ms"] / 1000)
+        return JSONResponse(status_code=faults["failure_status"],
+                            content={"error": {"message": "injected failure", "type": "server_error"}})
+    content = build_reply(body.get("messages", []))
+    if body.get("stream"):
+        return StreamingResponse(stream_reply(content, body.get("model", "stub")), media_type="text/event-stream")
+    await asyncio.sleep(faults["latency_ms"] / 1000)
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+@app.get("/stub/faults")
+async def get_faults():
+    return {**faults, **stats}
+
+
+@app.post("/stub/faults")
+async def set_faults(request: Request):
+    """调整故障参数：latency_ms / failure_rate / failure_status，未提供的保持不变"""
+    body = await request.json()
+    faults.update({key: body[key] for key in faults if key in body})
+    return {**faults, **stats}
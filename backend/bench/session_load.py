@@ -0,0 +1,80 @@
+"""
+会话存储多进程压测：模拟 N 个 uvicorn worker 同时读写同一会话后端，
+验证跨进程可见性并统计吞吐量随 worker 数的变化。
+
+运行:
+    cd backend && python -m bench.session_load --workers 1 2 4 --ops 2000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from leave_parser import parse_leave_request  # noqa: E402
+from session_store import ConversationStore, SQLiteSessionBackend  # noqa: E402
+
+
+def worker(path: str, worker_id: int, ops: int, sessions: int, result_queue):
+    store = ConversationStore(backend=SQLiteSessionBackend(path=path, max_sessions=sessions * 2))
+    started = time.perf_counter()
+    for i in range(ops):
+        emp_id = f"E{(worker_id * 7919 + i) % sessions:05d}"
+        # 一轮对话：规则解析、组装 prompt、写入回复、设置待确认资讯
+        extracted = parse_leave_request("明天下午請病假")
+        store.build_prompt(emp_id, [{"role": "system", "content": "請假助理"}], "明天下午請病假")
+        store.append_turn(emp_id, "明天下午請病假", json.dumps(extracted, ensure_ascii=False))
+        store.set_confirm(emp_id, extracted)
+    result_queue.put(time.perf_counter() - started)
+
+
+def check_cross_process(path: str) -> bool:
+    """在一个进程写入待确认资讯，另一个进程应能读到（对应不同 worker 处理「確認請假」）"""
+    writer = multiprocessing.Process(
+        target=lambda: ConversationStore(backend=SQLiteSessionBackend(path=path)).set_confirm("E_X", {"ok": True}))
+    writer.start()
+    writer.join()
+    return ConversationStore(backend=SQLiteSessionBackend(path=path)).get_confirm("E_X") == {"ok": True}
+
+
+def run(workers: int, ops: int, sessions: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        SQLiteSessionBackend(path=path)  # 预先建表
+        queue = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=worker, args=(path, w, ops, sessions, queue)) for w in range(workers)]
+        started = time.perf_counter()
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        wall = time.perf_counter() - started
+        cross_ok = check_cross_process(path)
+    turns = workers * ops
+    return {
+        "workers": workers,
+        "turns": turns,
+        "wall_s": round(wall, 3),
+        "turns_per_s": round(turns / wall, 1),
+        "cross_process_visible": cross_ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+    for workers in args.workers:
+        print(json.dumps(run(workers, args.ops, args.sessions)))
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("fork")
+    main()
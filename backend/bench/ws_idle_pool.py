@@ -0,0 +1,81 @@
+"""
+WebSocket 闲置连线与连接池占用测试：开启大量 /ws/leave 连线、各发送一条消息后保持闲置，
+检查连接池中被占用的连接数不随连线数增长，且 REST 请求仍能立即取得连接。
+
+运行:
+    cd backend && python -m bench.ws_idle_pool --sockets 100 --pool-size 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    # 连接池设定需在导入 database 之前决定；不允许溢出，池满时 2 秒即超时
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'ws_idle.db')}")
+    os.environ.setdefault("DB_POOL_SIZE", str(args.pool_size))
+    os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+    os.environ.setdefault("DB_POOL_TIMEOUT", "2")
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from database import Base, SessionLocal, engine, pool_stats
+    from models import Employee
+    from routers import leave, websocket
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all([Employee(emp_id=f"E{i:04d}", name=f"員工{i}", email=f"e{i}@example.com", login_password="x")
+                    for i in range(args.sockets)])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(websocket.router, prefix="/ws")
+    app.include_router(leave.router, prefix="/leave")
+
+    peak = 0
+    with TestClient(app) as client, ExitStack() as sockets:
+        for i in range(args.sockets):
+            ws = sockets.enter_context(client.websocket_connect("/ws/leave"))
+            ws.send_text(f"查詢請假@@E{i:04d}@@")
+            ws.receive_text()
+            peak = max(peak, engine.pool.checkedout())
+
+        # 所有连线仍开着但闲置：REST 请求应能立即取得连接
+        start = time.perf_counter()
+        response = client.get("/leave/leave-records/time-range",
+                              params={"start_date": "2024-01-01T00:00", "end_date": "2024-12-31T23:59"})
+        rest_ms = round((time.perf_counter() - start) * 1000, 1)
+        idle = pool_stats()["sync"]
+
+    result = {
+        "sockets": args.sockets,
+        "pool_size": engine.pool.size(),
+        "checked_out_peak": peak,
+        "checked_out_while_idle": idle["checked_out"],
+        "pool_timeouts": idle["timeouts"],
+        "rest_status": response.status_code,
+        "rest_ms": rest_ms,
+        "bounded": idle["checked_out"] == 0 and peak <= engine.pool.size() and response.status_code in (200, 404),
+    }
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["bounded"] else 1)
+
+
+if __name__ == "__main__":
+    main()
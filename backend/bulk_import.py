@@ -0,0 +1,313 @@
+"""
+员工与假数批量导入（CSV / NDJSON）。
+
+逐行读取、用既有的 EmployeeCreate / LeaveEntitlementCreate 验证，按 IMPORT_CHUNK_SIZE 分批：
+每批只用一次集合查询检查重复与外键，密码在进程池中并行哈希，再以 executemany 一次插入并提交。
+有问题的行不会中断导入，按行号记录在结果中。
+CSV 第一行为标题，每笔资料须在同一行内（不支持栏位中换行）。
+行以字节传入，逐行以 UTF-8 解码，编码或引号错误的行同样记为该行的错误。
+"""
+import csv
+import json
+import os
+import time
+from typing import AsyncIterator, Iterable, Optional, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import run_sync
+from leave_balance import sync_entitlement
+from models import Employee, LeaveBalance, LeaveEntitlement
+from schemas import EmployeeCreate, LeaveEntitlementCreate
+from utils import hash_passwords_async, hash_passwords_pooled
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))  # 每批验证与插入的行数
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))  # 结果中最多列出的错误行数
+
+FORMATS = ("csv", "ndjson")
+
+
+class RowDecoder:
+    """把文本行解码为 dict；CSV 的第一行为栏位名称，空白栏位视为 None"""
+
+    def __init__(self, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.fmt = fmt
+        self.header = None
+
+    def decode(self, line: Union[str, bytes]) -> Optional[dict]:
+        """
+        返回该行的资料；标题行与空行返回 None。
+        格式错误时抛出 ValueError（含 UnicodeDecodeError 与 JSON 错误）或 csv.Error。
+        """
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig")  # 只去掉开头的 BOM
+        line = line.strip("\r\n")
+        if not line.strip():
+            return None
+        if self.fmt == "ndjson":
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("Each NDJSON line must be an object")
+            return row
+        values = next(csv.reader([line], strict=True))
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return None
+        if len(values) != len(self.header):
+            raise ValueError(f"Expected {len(self.header)} columns, got {len(values)}")
+        return {name: (value if value != "" else None) for name, value in zip(self.header, values)}
+
+
+def _column_defaults(model) -> dict:
+    return {column.name: column.default.arg for column in model.__table__.columns
+            if column.default is not None and column.default.is_scalar}
+
+
+class BulkImporter:
+    """
+    导入流程的共用部分。子类提供 schema / model，并实作 filter（查重与外键检查）。
+    调用顺序：validate 每一行 -> 每批 filter -> prepare / prepare_async -> insert。
+    """
+
+    schema = None
+    model = None
+
+    def __init__(self, fmt: str):
+        self.decoder = RowDecoder(fmt)
+        self.rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self._defaults = _column_defaults(self.model)
+
+    def error(self, line_no: int, message: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def validate(self, line_no: int, line: Union[str, bytes]) -> Optional[tuple]:
+        """解码并验证一行，成功时返回 (行号, 栏位 dict)"""
+        try:
+            raw = self.decoder.decode(line)
+        except (ValueError, csv.Error) as e:
+            self.rows += 1
+            self.error(line_no, f"Invalid {self.decoder.fmt}: {e}")
+            return None
+        if raw is None:
+            return None
+        self.rows += 1
+        try:
+            data = self.schema(**raw).dict()
+        except ValidationError as e:
+            self.error(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            return None
+        # 栏位留空时使用数据表的默认值，且每行栏位一致才能以 executemany 插入
+        for name, default in self._defaults.items():
+            if data.get(name) is None:
+                data[name] = default
+        return line_no, data
+
+    def filter(self, db: Session, items: list) -> list:
+        raise NotImplementedError
+
+    def prepare(self, items: list):
+        """插入前的同步处理（命令行使用）"""
+
+    async def prepare_async(self, items: list):
+        """插入前的异步处理（API 使用）"""
+
+    def after_insert(self, db: Session, items: list):
+        """同一事务内、提交前的额外处理"""
+
+    def insert(self, db: Session, items: list):
+        if not items:
+            return
+        try:
+            db.execute(insert(self.model), [data for _, data in items])
+            self.after_insert(db, items)
+            db.commit()
+            self.inserted += len(items)
+        except IntegrityError:
+            # 批次中有与并发写入冲突的行：退回后逐行插入，找出有问题的行
+            db.rollback()
+            for line_no, data in items:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(self.model), [data])
+                    self.inserted += 1
+                except IntegrityError as e:
+                    self.error(line_no, f"Conflict: {e.orig}")
+            self.after_insert(db, items)
+            db.commit()
+
+    def result(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_sec": round(self.rows / elapsed, 1) if elapsed else None,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+        }
+
+
+class EmployeeImporter(BulkImporter):
+    schema = EmployeeCreate
+    model = Employee
+
+    def __init__(self, fmt: str):
+        super().__init__(fmt)
+        self._emp_ids = set()
+        self._emails = set()
+
+    def filter(self, db: Session, items: list) -> list:
+        emp_ids = {data["emp_id"] for _, data in items}
+        emails = {data["email"] for _, data in items}
+        existing_ids, existing_emails = set(), set()
+        for emp_id, email in db.execute(
+            select(Employee.emp_id, Employee.email).where(or_(Employee.emp_id.in_(emp_ids), Employee.email.in_(emails)))
+        ):
+            existing_ids.add(emp_id)
+            existing_emails.add(email)
+
+        accepted = []
+        for line_no, data in items:
+            if data["emp_id"] in existing_ids or data["emp_id"] in self._emp_ids:
+                self.error(line_no, f"Employee {data['emp_id']} already exists")
+            elif data["email"] in existing_emails or data["email"] in self._emails:
+                self.error(line_no, f"Email {data['email']} already exists")
+            else:
+                self._emp_ids.add(data["emp_id"])
+                self._emails.add(data["email"])
+                accepted.append((line_no, data))
+        return accepted
+
+    def prepare(self, items: list):
+        hashed = hash_passwords_pooled([data["login_password"] for _, data in items])
+        for (_, data), password_hash in zip(items, hashed):
+            data["login_password"] = password_hash
+
+    async def prepare_async(self, items: list):
+        hashed = await hash_passwords_async([data["login_password"] for _, data in items])
+        for (_, data), password_hash in zip(items, hashed):
+            data["login_password"] = password_hash
+
+
+class LeaveEntitlementImporter(BulkImporter):
+    schema = LeaveEntitlementCreate
+    model = LeaveEntitlement
+
+    def __init__(self, fmt: str):
+        super().__init__(fmt)
+        self._keys = set()
+
+    def filter(self, db: Session, items: list) -> list:
+        emp_ids = {data["emp_id"] for _, data in items}
+        known = set(db.scalars(select(Employee.emp_id).where(Employee.emp_id.in_(emp_ids))))
+        existing = set(db.execute(
+            select(LeaveEntitlement.emp_id, LeaveEntitlement.leave_type).where(LeaveEntitlement.emp_id.in_(emp_ids))
+        ).all())
+
+        accepted = []
+        for line_no, data in items:
+            key = (data["emp_id"], data["leave_type"])
+            if data["emp_id"] not in known:
+                self.error(line_no, f"Employee {data['emp_id']} not found")
+            elif key in existing or key in self._keys:
+                self.error(line_no, f"Entitlement {data['leave_type']} for {data['emp_id']} already exists")
+            else:
+                self._keys.add(key)
+                accepted.append((line_no, data))
+        return accepted
+
+    def after_insert(self, db: Session, items: list):
+        # 只有已建立余额记录的 (员工, 假别) 需要同步可请时数
+        keys = {(data["emp_id"], data["leave_type"]) for _, data in items}
+        for emp_id, leave_type in db.execute(
+            select(LeaveBalance.emp_id, LeaveBalance.leave_type).distinct()
+            .where(tuple_(LeaveBalance.emp_id, LeaveBalance.leave_type).in_(keys))
+        ).all():
+            sync_entitlement(db, emp_id, leave_type)
+
+
+IMPORTERS = {
+    "employees": EmployeeImporter,
+    "leave-entitlements": LeaveEntitlementImporter,
+}
+
+
+def run_import(importer: BulkImporter, lines: Iterable[Union[str, bytes]], db: Session,
+               chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """同步导入（命令行使用）"""
+    chunk = []
+    for line_no, line in enumerate(lines, start=1):
+        item = importer.validate(line_no, line)
+        if item is not None:
+            chunk.append(item)
+        if len(chunk) >= chunk_size:
+            _write_chunk(importer, db, chunk)
+            chunk = []
+    _write_chunk(importer, db, chunk)
+    return importer.result()
+
+
+def _write_chunk(importer: BulkImporter, db: Session, chunk: list):
+    if not chunk:
+        return
+    accepted = importer.filter(db, chunk)
+    importer.prepare(accepted)
+    importer.insert(db, accepted)
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """把请求 body 的字节流切成行；解码在 RowDecoder 中逐行进行，编码错误只影响该行"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def run_import_async(importer: BulkImporter, lines: AsyncIterator[bytes], db,
+                           chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    异步导入（API 使用）：边接收边处理，内存只保留一批资料。
+    数据库操作经由 run_sync 执行，不阻塞事件循环；哈希在进程池中执行。
+    """
+    chunk = []
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        item = importer.validate(line_no, line)
+        if item is not None:
+            chunk.append(item)
+        if len(chunk) >= chunk_size:
+            await _write_chunk_async(importer, db, chunk)
+            chunk = []
+    await _write_chunk_async(importer, db, chunk)
+    return importer.result()
+
+
+async def _write_chunk_async(importer: BulkImporter, db, chunk: list):
+    if not chunk:
+        return
+    accepted = await run_sync(db, importer.filter, chunk)
+    await importer.prepare_async(accepted)
+    await run_sync(db, importer.insert, accepted)
+
+
+def request_format(fmt: Optional[str], content_type: Optional[str]) -> str:
+    """未指定 format 时按 Content-Type 判断，默认 CSV"""
+    if fmt:
+        return fmt
+    return "ndjson" if content_type and "json" in content_type else "csv"
@@ -0,0 +1,16 @@
+"""
+为已存在的数据表补建 models.py 中声明的索引。
+
+Base.metadata.create_all 只会为新建的表建立索引，已上线的数据库需执行一次本脚本。
+
+用法:
+    python create_indexes.py
+"""
+from database import Base, engine
+import models  # noqa: F401  注册所有模型
+
+if __name__ == "__main__":
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+            print(f"ok {table.name}.{index.name}")
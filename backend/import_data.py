@@ -0,0 +1,35 @@
+"""
+从 CSV / NDJSON 文件批量导入员工或员工假数。
+
+用法:
+    python import_data.py employees new_branch.csv
+    python import_data.py leave-entitlements entitlements.ndjson [--format ndjson] [--chunk-size 1000]
+"""
+import argparse
+import json
+import sys
+
+from bulk_import import FORMATS, IMPORT_CHUNK_SIZE, IMPORTERS, run_import
+from database import SessionLocal
+from utils import shutdown_hash_pool
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import employees or leave entitlements")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="CSV 或 NDJSON 文件，- 表示标准输入")
+    parser.add_argument("--format", choices=FORMATS, help="默认按扩展名判断")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    # 以二进制读取，编码错误的行记为该行的错误而不中断导入
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    db = SessionLocal()
+    try:
+        result = run_import(IMPORTERS[args.kind](fmt), source, db, args.chunk_size)
+    finally:
+        db.close()
+        source.close()
+        shutdown_hash_pool()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    sys.exit(1 if result["failed"] else 0)
@@ -0,0 +1,95 @@
+"""
+请假批量审核：主管一次提交多笔 (leave_id, decision)，在同一事务内完成检查、状态更新与余额调整。
+
+先一次取出所有相关记录并逐笔检查（是否存在、是否为其下属、是否待审核），
+再按目标状态分组批量 UPDATE，余额按 (emp_id, leave_type, year) 汇总后调整。
+这里的函数不会 commit，由调用方提交。
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import extract, select, update
+from sqlalchemy.orm import Session
+
+from leave_balance import apply_bulk_status_change
+from models import LeaveRecord
+from org_chart import org_chart, SUPERVISOR_MAX_DEPTH
+
+# 审核决定对应的新状态（leave_records.status 没有「驳回」，驳回的申请视为取消）
+DECISION_STATUS = {
+    "approve": "approved",
+    "reject": "cancelled",
+}
+
+BATCH_CHUNK_SIZE = 5000  # 单条 SQL 中 IN 列表的最大长度
+
+
+def _chunks(items: list, size: int = BATCH_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def apply_decisions(db: Session, supervisor_id: str, decisions) -> list:
+    """
+    decisions 为 (leave_id, decision) 序列，decision 为 DECISION_STATUS 的键。
+    返回与输入顺序一致的结果列表：{"leave_id", "emp_id", "decision", "status", "error"}，
+    error 为 None 表示已套用，否则为 not_found / not_subordinate / not_pending / duplicate / invalid_decision。
+    """
+    leave_ids = list({leave_id for leave_id, _ in decisions})
+    records = {}
+    for chunk in _chunks(leave_ids):
+        # 锁定待审核记录，避免与其它审核或取消同时修改
+        for row in db.execute(
+            select(LeaveRecord.id, LeaveRecord.emp_id, LeaveRecord.leave_type,
+                   extract("year", LeaveRecord.start_datetime).label("year"), LeaveRecord.status,
+                   LeaveRecord.total_hours)
+            .where(LeaveRecord.id.in_(chunk))
+            .with_for_update()
+        ):
+            records[row.id] = row
+
+    results = []
+    accepted = defaultdict(list)  # 新状态 -> [leave_id]
+    hours = defaultdict(Decimal)  # (新状态, emp_id, leave_type, year) -> 时数
+    seen = set()
+    for leave_id, decision in decisions:
+        new_status = DECISION_STATUS.get(decision)
+        record = records.get(leave_id)
+        if new_status is None:
+            error = "invalid_decision"
+        elif leave_id in seen:
+            error = "duplicate"
+        elif record is None:
+            error = "not_found"
+        elif not org_chart.is_subordinate(supervisor_id, record.emp_id, SUPERVISOR_MAX_DEPTH):
+            error = "not_subordinate"
+        elif record.status != "requested":
+            error = "not_pending"
+        else:
+            error = None
+            seen.add(leave_id)
+            accepted[new_status].append(leave_id)
+            hours[(new_status, record.emp_id, record.leave_type, int(record.year))] += Decimal(record.total_hours or 0)
+        results.append({
+            "leave_id": leave_id,
+            "emp_id": record.emp_id if record is not None else None,
+            "decision": decision,
+            "status": new_status if error is None else (record.status if record is not None else None),
+            "error": error,
+        })
+
+    # 每种目标状态一条 UPDATE（过长时分段），状态条件确保只改动待审核的记录
+    for new_status, ids in accepted.items():
+        for chunk in _chunks(ids):
+            db.execute(
+                update(LeaveRecord)
+                .where(LeaveRecord.id.in_(chunk), LeaveRecord.status == "requested")
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+
+    for new_status in accepted:
+        groups = [(emp_id, leave_type, year, total)
+                  for (status, emp_id, leave_type, year), total in hours.items() if status == new_status]
+        apply_bulk_status_change(db, groups, "requested", new_status)
+    return results
@@ -0,0 +1,124 @@
+"""
+请假余额账本（leave_balances 表）。
+
+每笔请假状态变化时在同一个事务内调整对应 (emp_id, leave_type, year) 的申请中/已核准时数，
+余额检查只需一次主键查询；rebuild_balances 可从 leave_records 整批重建账本。
+这里的函数都不会 commit，由调用方在自己的事务中提交。
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import delete, extract, func, insert, select
+from sqlalchemy.orm import Session
+
+from models import Employee, LeaveBalance, LeaveEntitlement, LeaveRecord
+from work_hours import daily_hours, make_shift
+
+# 会计入余额的状态及其对应的栏位
+STATUS_COLUMNS = {
+    "requested": "pending_hours",
+    "approved": "used_hours",
+}
+
+
+def _entitlement_hours(db: Session, emp_id: str, leave_type: str) -> Decimal:
+    entitlement = db.query(LeaveEntitlement).filter_by(emp_id=emp_id, leave_type=leave_type).first()
+    if not entitlement or not entitlement.entitlement_days:
+        return Decimal("0")
+    employee = db.query(Employee).filter(Employee.emp_id == emp_id).first()
+    shift = make_shift(employee.work_start_time, employee.work_end_time) if employee else make_shift()
+    return entitlement.entitlement_days * daily_hours(shift)
+
+
+def get_balance(db: Session, emp_id: str, leave_type: str, year: int, for_update: bool = False) -> LeaveBalance:
+    """按主键取得余额，不存在时依假数设定建立"""
+    balance = db.get(LeaveBalance, (emp_id, leave_type, year), with_for_update=for_update)
+    if balance is None:
+        balance = LeaveBalance(emp_id=emp_id, leave_type=leave_type, year=year,
+                               entitlement_hours=_entitlement_hours(db, emp_id, leave_type),
+                               used_hours=Decimal("0"), pending_hours=Decimal("0"))
+        db.add(balance)
+        db.flush()
+    return balance
+
+
+def available_hours(balance: LeaveBalance) -> Decimal:
+    return Decimal(balance.entitlement_hours) - Decimal(balance.used_hours) - Decimal(balance.pending_hours)
+
+
+def remaining_hours(db: Session, emp_id: str, leave_type: str, year: int):
+    """
+    查询剩余可请时数，不会建立余额记录。
+    该假别未设定假数（可请时数为 0）时返回 None，表示不受余额限制或无此假别。
+    """
+    balance = db.get(LeaveBalance, (emp_id, leave_type, year))
+    if balance is not None:
+        return available_hours(balance) if balance.entitlement_hours else None
+    return _entitlement_hours(db, emp_id, leave_type) or None
+
+
+def adjust_balance(db: Session, emp_id: str, leave_type: str, year: int, status: str, hours):
+    """将 hours 计入（负数则扣回）该状态对应的栏位；不计入余额的状态直接忽略"""
+    column = STATUS_COLUMNS.get(status)
+    if column is None or not hours:
+        return
+    balance = get_balance(db, emp_id, leave_type, year, for_update=True)
+    setattr(balance, column, Decimal(getattr(balance, column)) + Decimal(hours))
+
+
+def apply_status_change(db: Session, record: LeaveRecord, old_status: str, new_status: str):
+    """请假记录状态由 old_status 变为 new_status 时调整余额（新建记录时 old_status 传 None）"""
+    year = record.start_datetime.year
+    adjust_balance(db, record.emp_id, record.leave_type, year, old_status, -(record.total_hours or 0))
+    adjust_balance(db, record.emp_id, record.leave_type, year, new_status, record.total_hours or 0)
+
+
+def apply_bulk_status_change(db: Session, groups, old_status: str, new_status: str):
+    """
+    批量状态变更后调整余额。
+    groups 为 (emp_id, leave_type, year, hours) 的序列，通常来自对被更新记录的 GROUP BY 汇总。
+    """
+    for emp_id, leave_type, year, hours in groups:
+        adjust_balance(db, emp_id, leave_type, int(year), old_status, -(hours or 0))
+        adjust_balance(db, emp_id, leave_type, int(year), new_status, hours or 0)
+
+
+def sync_entitlement(db: Session, emp_id: str, leave_type: str):
+    """假数设定变更后，更新该员工该假别已存在的余额记录"""
+    hours = _entitlement_hours(db, emp_id, leave_type)
+    db.query(LeaveBalance).filter_by(emp_id=emp_id, leave_type=leave_type).update(
+        {"entitlement_hours": hours}, synchronize_session=False)
+
+
+def rebuild_balances(db: Session, batch_size: int = 5000) -> int:
+    """从 leave_records 与 leave_entitlements 整批重建余额账本，返回写入的笔数"""
+    year = extract("year", LeaveRecord.start_datetime)
+    totals = db.execute(
+        select(LeaveRecord.emp_id, LeaveRecord.leave_type, year, LeaveRecord.status,
+               func.sum(LeaveRecord.total_hours))
+        .where(LeaveRecord.status.in_(list(STATUS_COLUMNS)))
+        .group_by(LeaveRecord.emp_id, LeaveRecord.leave_type, year, LeaveRecord.status)
+    ).all()
+
+    entitlements = {}
+    for emp_id, leave_type, days, work_start, work_end in db.execute(
+        select(LeaveEntitlement.emp_id, LeaveEntitlement.leave_type, LeaveEntitlement.entitlement_days,
+               Employee.work_start_time, Employee.work_end_time)
+        .join(Employee, Employee.emp_id == LeaveEntitlement.emp_id)
+    ):
+        entitlements[(emp_id, leave_type)] = (days or 0) * daily_hours(make_shift(work_start, work_end))
+
+    balances = defaultdict(lambda: {"used_hours": Decimal("0"), "pending_hours": Decimal("0")})
+    for emp_id, leave_type, record_year, status, hours in totals:
+        balances[(emp_id, leave_type, int(record_year))][STATUS_COLUMNS[status]] += Decimal(hours or 0)
+
+    rows = [
+        {"emp_id": emp_id, "leave_type": leave_type, "year": record_year,
+         "entitlement_hours": entitlements.get((emp_id, leave_type), Decimal("0")), **values}
+        for (emp_id, leave_type, record_year), values in balances.items()
+    ]
+
+    db.execute(delete(LeaveBalance))
+    for i in range(0, len(rows), batch_size):
+        db.execute(insert(LeaveBalance), rows[i:i + batch_size])
+    return len(rows)
@@ -0,0 +1,211 @@
+"""
+请假语句的规则解析器（快速路径）。
+
+对 "明天下午請病假"、"3月5日到3月7日整天特休" 这类结构明确的输入直接在本地解析，
+输出与 LLM 提取结果相同格式的 dict；只要存在任何歧义就返回 None，交由 LLM 处理。
+"""
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from work_hours import LUNCH_START, LUNCH_END
+
+# 标准假别 -> 用户常用说法（按最长匹配）
+LEAVE_TYPES = {
+    "特休": ["特別休假", "特休假", "特休", "年假", "年休"],
+    "病假": ["病假"],
+    "事假": ["事假"],
+    "婚假": ["婚假"],
+    "喪假": ["喪假"],
+    "公假": ["公假"],
+    "陪產假": ["陪產假"],
+    "產假": ["產假"],
+    "生理假": ["生理假"],
+    "家庭照顧假": ["家庭照顧假"],
+    "補休": ["補休"],
+}
+
+_ALIASES = sorted(((alias, name) for name, aliases in LEAVE_TYPES.items() for alias in aliases),
+                  key=lambda item: -len(item[0]))
+
+# 出现这些字眼时语义不确定，交给 LLM
+_HEDGES = ("不請", "不用", "不要", "不是", "改成", "改為", "或", "還是", "?", "？", "嗎")
+
+# 常见简体写法转换为繁体，便于统一匹配
+_NORMALIZE = str.maketrans({"后": "後", "这": "這", "点": "點", "号": "號", "周": "週", "礼": "禮", "请": "請",
+                            "产": "產", "丧": "喪", "补": "補", "别": "別", "还": "還", "为": "為"})
+
+_WEEKDAYS = {"一": 0, "二": 1, "三": 2, "四": 3, "五": 4, "六": 5, "日": 6, "天": 6}
+
+_RELATIVE_DAYS = {"今天": 0, "今日": 0, "明天": 1, "明日": 1, "後天": 2, "大後天": 3}
+
+_DATE_PATTERNS = [
+    re.compile(r"(?P<y>\d{4})[-/年](?P<m>\d{1,2})[-/月](?P<d>\d{1,2})[日號]?"),
+    re.compile(r"(?P<m>\d{1,2})月(?P<d>\d{1,2})[日號]"),
+    re.compile(r"(?<![\d:：])(?P<m>\d{1,2})/(?P<d>\d{1,2})(?![\d:：])"),
+    re.compile(r"(?P<rel>大後天|今天|今日|明天|明日|後天)"),
+    re.compile(r"(?P<week>這|本|下下|下)?(?:週|星期|禮拜)(?P<wd>[一二三四五六日天])"),
+]
+
+_TIME_PATTERN = re.compile(
+    r"(?P<prefix>上午|早上|中午|下午|晚上)?\s*(?P<h>\d{1,2})(?:[:：](?P<m>\d{2})|點(?:(?P<half>半)|(?P<m2>\d{1,2})分?)?)")
+
+# 两个日期之间必须出现的连接词，否则可能是两段独立的请假
+_RANGE_CONNECTORS = ("到", "至", "-", "~", "～", "－")
+
+# 日期、时间、时段都匹配完后仍残留这些字，表示有未理解的时间或时长（例如 "兩點"、"2小時"、"半天"）
+_LEFTOVER = re.compile(r"[\d零〇一二兩三四五六七八九十半點時]")
+
+_PERIODS = [
+    (re.compile(r"整天|全天|一整天|一天"), "day"),
+    (re.compile(r"上午|早上"), "am"),
+    (re.compile(r"下午"), "pm"),
+]
+
+
+def _blank(text: str, match) -> str:
+    """将已匹配的片段替换为空格，避免被后续规则重复匹配"""
+    return text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+
+
+def _resolve_date(match, today: date) -> Optional[date]:
+    groups = match.groupdict()
+    if groups.get("rel"):
+        return today + timedelta(days=_RELATIVE_DAYS[groups["rel"]])
+    if groups.get("wd"):
+        target = _WEEKDAYS[groups["wd"]]
+        monday = today - timedelta(days=today.weekday())
+        week = groups.get("week")
+        if week in ("這", "本"):
+            return monday + timedelta(days=target)
+        if week == "下":
+            return monday + timedelta(days=7 + target)
+        if week == "下下":
+            return monday + timedelta(days=14 + target)
+        # 未指明哪一周时取最近的下一个该星期几
+        return today + timedelta(days=(target - today.weekday()) % 7 or 7)
+    year = int(groups["y"]) if groups.get("y") else today.year
+    try:
+        result = date(year, int(groups["m"]), int(groups["d"]))
+    except ValueError:
+        return None
+    if not groups.get("y") and result < today - timedelta(days=180):
+        # 未写年份且日期已过去很久，视为明年
+        result = date(year + 1, result.month, result.day)
+    return result
+
+
+def _find_dates(text: str, today: date):
+    found = []
+    for pattern in _DATE_PATTERNS:
+        for match in list(pattern.finditer(text)):
+            resolved = _resolve_date(match, today)
+            if resolved is None:
+                return None, text
+            found.append((match.start(), match.end(), resolved))
+            text = _blank(text, match)
+    found.sort()
+    if len(found) == 2 and not any(word in text[found[0][1]:found[1][0]] for word in _RANGE_CONNECTORS):
+        return None, text
+    return [d for _, _, d in found], text
+
+
+def _find_times(text: str):
+    found = []
+    prefix = None
+    for match in list(_TIME_PATTERN.finditer(text)):
+        prefix = match.group("prefix") or prefix  # "下午3點到5點" 中第二个时间沿用 "下午"
+        hour = int(match.group("h"))
+        minute = 30 if match.group("half") else int(match.group("m") or match.group("m2") or 0)
+        if prefix in ("下午", "晚上") and hour < 12:
+            hour += 12
+        if hour > 23 or minute > 59:
+            return None, text
+        found.append(time(hour, minute))
+        text = _blank(text, match)
+    return found, text
+
+
+def _find_periods(text: str):
+    found = []
+    for pattern, name in _PERIODS:
+        for match in list(pattern.finditer(text)):
+            found.append((match.start(), name))
+            text = _blank(text, match)
+    found.sort()
+    return [name for _, name in found], text
+
+
+def _find_leave_type(text: str) -> Optional[str]:
+    types = set()
+    for alias, name in _ALIASES:
+        if alias in text:
+            types.add(name)
+            text = text.replace(alias, " " * len(alias))
+    return types.pop() if len(types) == 1 else None
+
+
+def _period_bounds(period: str, work_start: time, work_end: time):
+    lunch_start = datetime.strptime(LUNCH_START, "%H:%M").time()
+    lunch_end = datetime.strptime(LUNCH_END, "%H:%M").time()
+    return {
+        "day": (work_start, work_end),
+        "am": (work_start, lunch_start),
+        "pm": (lunch_end, work_end),
+    }[period]
+
+
+def parse_leave_request(user_input: str, today: date = None,
+                        work_start_time: str = "09:30", work_end_time: str = "18:30") -> Optional[dict]:
+    """
+    解析请假语句，返回 {"leave_type", "start_datetime", "end_datetime"}（格式 YYYY-MM-DD HH:MM）。
+    仅在假别、日期、时段都能唯一确定时返回结果，否则返回 None。
+    """
+    today = today or date.today()
+    text = re.sub(r"@@.*?@@", "", user_input).translate(_NORMALIZE)
+    if any(word in text for word in _HEDGES):
+        return None
+
+    leave_type = _find_leave_type(text)
+    if leave_type is None:
+        return None
+
+    dates, text = _find_dates(text, today)
+    if not dates or len(dates) > 2:
+        return None
+    start_date, end_date = dates[0], dates[-1]
+
+    times, text = _find_times(text)
+    if times is None:
+        return None
+
+    periods, text = _find_periods(text)
+    if _LEFTOVER.search(text):
+        return None
+
+    work_start = datetime.strptime(work_start_time, "%H:%M").time()
+    work_end = datetime.strptime(work_end_time, "%H:%M").time()
+
+    if len(times) == 2:
+        start_time, end_time = times
+    elif len(times) == 0:
+        if len(periods) == 1 and (periods[0] == "day" or start_date == end_date):
+            start_time, end_time = _period_bounds(periods[0], work_start, work_end)
+        elif len(periods) == 2:
+            start_time = _period_bounds(periods[0], work_start, work_end)[0]
+            end_time = _period_bounds(periods[1], work_start, work_end)[1]
+        else:
+            return None
+    else:
+        return None
+
+    start_dt = datetime.combine(start_date, start_time)
+    end_dt = datetime.combine(end_date, end_time)
+    if start_dt >= end_dt:
+        return None
+
+    return {
+        "leave_type": leave_type,
+        "start_datetime": start_dt.strftime("%Y-%m-%d %H:%M"),
+        "end_datetime": end_dt.strftime("%Y-%m-%d %H:%M"),
+    }
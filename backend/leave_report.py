@@ -0,0 +1,115 @@
+"""
+请假报表：在数据库中按员工、假别、部门（employees.position）与日/周/月做 GROUP BY 汇总，
+以及不整批载入内存的请假明细流式导出。
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import Employee, LeaveRecord
+
+REPORT_STATUSES = ("requested", "approved")  # 默认计入报表的状态
+GROUP_COLUMNS = ("emp_id", "leave_type", "department")
+PERIODS = ("day", "week", "month")
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = ("id", "emp_id", "name", "department", "leave_type", "start_datetime", "end_datetime",
+                  "status", "total_hours")
+
+
+def period_expression(dialect: str, period: str):
+    """按数据库方言产生日期分组运算式；周以该周星期一的日期表示"""
+    column = LeaveRecord.start_datetime
+    if dialect == "sqlite":
+        return {
+            "day": func.date(column),
+            "week": func.date(column, "weekday 0", "-6 days"),
+            "month": func.strftime("%Y-%m", column),
+        }[period]
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(period, column), "YYYY-MM-DD" if period != "month" else "YYYY-MM")
+    # MySQL / MariaDB
+    return {
+        "day": func.date(column),
+        "week": func.subdate(func.date(column), func.weekday(column)),
+        "month": func.date_format(column, "%Y-%m"),
+    }[period]
+
+
+def _filters(start_date: datetime, end_date: datetime, statuses):
+    return (
+        LeaveRecord.start_datetime >= start_date,
+        LeaveRecord.start_datetime <= end_date,
+        LeaveRecord.status.in_(list(statuses)),
+    )
+
+
+def summarize(db: Session, start_date: datetime, end_date: datetime, group_by: list,
+              period: str = None, statuses=REPORT_STATUSES) -> list:
+    """
+    汇总 start_date 到 end_date（按开始时间）之间的请假时数。
+    group_by 为 GROUP_COLUMNS 的子集，period 为 PERIODS 之一或 None。
+    返回 [{分组栏位..., "period", "total_hours", "records"}]，依分组栏位排序。
+    """
+    keys = []
+    if "emp_id" in group_by:
+        keys.append(LeaveRecord.emp_id.label("emp_id"))
+    if "leave_type" in group_by:
+        keys.append(LeaveRecord.leave_type.label("leave_type"))
+    if "department" in group_by:
+        keys.append(Employee.position.label("department"))
+    if period:
+        keys.append(period_expression(db.bind.dialect.name, period).label("period"))
+
+    query = select(*keys, func.sum(LeaveRecord.total_hours).label("total_hours"),
+                   func.count().label("records")).where(*_filters(start_date, end_date, statuses))
+    if "department" in group_by:
+        query = query.join(Employee, Employee.emp_id == LeaveRecord.emp_id)
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+
+    return [
+        {**{key: (str(value) if key == "period" and value is not None else value)
+            for key, value in row._mapping.items() if key not in ("total_hours", "records")},
+         "total_hours": row.total_hours or 0, "records": row.records}
+        for row in db.execute(query)
+    ]
+
+
+def export_rows(db: Session, start_date: datetime, end_date: datetime, statuses=REPORT_STATUSES,
+                batch_size: int = EXPORT_BATCH_SIZE):
+    """逐批读取请假明细（服务端游标），按开始时间排序以使用 (start_datetime, end_datetime) 索引"""
+    query = (
+        select(LeaveRecord.id, LeaveRecord.emp_id, Employee.name, Employee.position, LeaveRecord.leave_type,
+               LeaveRecord.start_datetime, LeaveRecord.end_datetime, LeaveRecord.status, LeaveRecord.total_hours)
+        .outerjoin(Employee, Employee.emp_id == LeaveRecord.emp_id)
+        .where(*_filters(start_date, end_date, statuses))
+        .order_by(LeaveRecord.start_datetime, LeaveRecord.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(query).partitions():
+        yield partition
+
+
+def export_csv(batches):
+    """把 export_rows 的批次转为 CSV 文本块，每批输出一次"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield "\ufeff" + buffer.getvalue()  # BOM：让 Excel 以 UTF-8 开启
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+def export_ndjson(batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=str) + "\n" for row in batch
+        )
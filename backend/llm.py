@@ -0,0 +1,216 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAIError
+
+from metrics import llm_request_duration, llm_tokens
+from rate_limit import KeyedRateLimiter
+
+load_dotenv()
+
+# LLM 调用配置
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 同时进行的 LLM 请求上限
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))  # 单次调用超时（秒），包含排队时间
+
+# 限流：每位用户与全系统各一个令牌桶（每秒补充的次数 / 最多累积的次数）
+LLM_USER_RATE = float(os.getenv("LLM_USER_RATE", "0.2"))
+LLM_USER_BURST = float(os.getenv("LLM_USER_BURST", "5"))
+LLM_GLOBAL_RATE = float(os.getenv("LLM_GLOBAL_RATE", "5"))
+LLM_GLOBAL_BURST = float(os.getenv("LLM_GLOBAL_BURST", "20"))
+
+# 熔断：连续失败 LLM_BREAKER_FAILURES 次后断开，LLM_BREAKER_RESET_SECONDS 秒后放行一次试探请求
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=os.getenv("OPENAI_BASE_URL") or None,  # 可指向本地 stub 服务进行测试
+    timeout=LLM_TIMEOUT,
+    max_retries=0,
+)
+
+_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+
+class LLMError(Exception):
+    """LLM 调用失败或超时"""
+
+
+class LLMRateLimited(LLMError):
+    """超过用户或全系统的调用频率上限，未实际调用"""
+
+
+class LLMUnavailable(LLMError):
+    """熔断器断开中，未实际调用"""
+
+
+class CircuitBreaker:
+    """
+    熔断器：closed（正常）-> 连续失败达 failure_threshold 次 -> open（直接拒绝）
+    -> 经过 reset_seconds -> half_open（只放行一个试探请求）-> 成功则 closed，失败则再次 open。
+    上游变慢或故障时，其它连线不必各自等到超时。
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_seconds: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """调用被取消（例如连线断开）时归还试探名额，不计成功或失败"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened": self.opened,
+                "short_circuited": self.short_circuited,
+            }
+
+
+breaker = CircuitBreaker()
+user_limiter = KeyedRateLimiter(LLM_USER_RATE, LLM_USER_BURST)
+global_limiter = KeyedRateLimiter(LLM_GLOBAL_RATE, LLM_GLOBAL_BURST, max_keys=1)
+
+_counters = {"calls": 0, "failures": 0}
+
+
+async def _guarded(make_call, model: str, user: Optional[str], timeout: float):
+    """依序检查熔断器、用户限流、全局限流，通过后才建立并执行调用，结果回报给熔断器"""
+    if not breaker.allow():
+        raise LLMUnavailable("LLM circuit breaker is open")
+    if user is not None and not user_limiter.allow(user):
+        breaker.release()
+        raise LLMRateLimited(f"LLM rate limit exceeded for {user}")
+    if not global_limiter.allow("*"):
+        breaker.release()
+        raise LLMRateLimited("Global LLM rate limit exceeded")
+
+    _counters["calls"] += 1
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        result = await asyncio.wait_for(make_call(), timeout=timeout or LLM_TIMEOUT)
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        _counters["failures"] += 1
+        breaker.record_failure()
+        raise LLMError("LLM request timed out")
+    except OpenAIError as e:
+        outcome = "error"
+        _counters["failures"] += 1
+        breaker.record_failure()
+        raise LLMError(str(e))
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        breaker.release()
+        raise
+    except Exception:
+        # 其它异常（例如 on_delta 写入已关闭的连线）不代表上游故障，只归还试探名额
+        outcome = "error"
+        breaker.release()
+        raise
+    finally:
+        llm_request_duration.observe(time.perf_counter() - started, model=model, outcome=outcome)
+    breaker.record_success()
+    return result
+
+
+def _record_usage(model: str, usage):
+    if usage is not None:
+        llm_tokens.inc(usage.prompt_tokens or 0, model=model, kind="prompt")
+        llm_tokens.inc(usage.completion_tokens or 0, model=model, kind="completion")
+
+
+async def _create(model: str, messages: list):
+    async with _semaphore:
+        return await client.chat.completions.create(model=model, messages=messages)
+
+
+async def chat_completion(messages: list, model: str = "gpt-3.5-turbo", timeout: float = None,
+                          user: str = None) -> str:
+    """
+    异步调用 LLM 并返回回复文本。
+    受全局并发上限、限流（user 为限流对象，通常是 emp_id）与熔断器约束；
+    超时或调用失败时抛出 LLMError，被限流或熔断时抛出其子类 LLMRateLimited / LLMUnavailable；
+    调用方任务被取消时（例如 WebSocket 断开），底层 HTTP 请求会一并取消。
+    """
+    response = await _guarded(lambda: _create(model, messages), model, user, timeout)
+    _record_usage(model, response.usage)
+    return response.choices[0].message.content
+
+
+async def _stream(model: str, messages: list, on_delta) -> str:
+    async with _semaphore:
+        stream = await client.chat.completions.create(model=model, messages=messages, stream=True,
+                                                      stream_options={"include_usage": True})
+        parts = []
+        async for chunk in stream:
+            if not chunk.choices:
+                _record_usage(model, chunk.usage)  # include_usage 时最后一个 chunk 只带用量
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                parts.append(text)
+                await on_delta(text)
+        return "".join(parts)
+
+
+async def chat_completion_stream(messages: list, on_delta, model: str = "gpt-3.5-turbo",
+                                 timeout: float = None, user: str = None) -> str:
+    """
+    以流式方式调用 LLM，每收到一段增量文本即调用 await on_delta(text)，
+    结束后返回完整回复文本。并发、限流、熔断、超时与取消语义同 chat_completion。
+    """
+    return await _guarded(lambda: _stream(model, messages, on_delta), model, user, timeout)
+
+
+def llm_stats() -> dict:
+    """LLM 调用次数、失败次数、限流与熔断统计"""
+    return {
+        **_counters,
+        "throttled_user": user_limiter.throttled,
+        "throttled_global": global_limiter.throttled,
+        "breaker": breaker.stats(),
+    }
@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 
 
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import Base, engine
-from routers import auth, leave, websocket, employee , leave_entitlements
+from database import Base, engine, pool_stats
+from llm import llm_stats
+from metrics import MetricsMiddleware, registry
+from notifications import notifier
+from response_cache import response_cache
+from summary_cache import summary_cache
+from routers import auth, leave, websocket, employee , leave_entitlements, report
+from utils import get_token_claims, shutdown_hash_pool
 
 
 # 创建数据库表
@@ -18,6 +25,72 @@ app = FastAPI(
 )
 
 
+@app.get("/db/stats", tags=["Monitoring"])
+def get_db_stats():
+    """数据库连接池状态：使用中/闲置连接数、取得连接的等待时间与超时次数"""
+    return pool_stats()
+
+
+@app.get("/cache/stats", tags=["Monitoring"])
+def get_cache_stats():
+    """员工与假数查询的响应缓存、LLM 请假摘要缓存的命中率"""
+    return {"responses": response_cache.stats(), "leave_summaries": summary_cache.stats()}
+
+
+@app.get("/llm/stats", tags=["Monitoring"])
+def get_llm_stats():
+    """LLM 调用、失败、被限流（用户/全局）与熔断短路的次数，以及熔断器状态"""
+    return llm_stats()
+
+
+@app.get("/metrics", tags=["Monitoring"], response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus 文本格式的指标"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def _component_metrics():
+    """把各模块已有的统计转为指标，每次抓取时读取"""
+    for name, pool in pool_stats().items():
+        labels = {"engine": name}
+        yield "oa_db_pool_checked_out", "Connections currently checked out", "gauge", labels, pool.get("checked_out", 0)
+        yield "oa_db_pool_checkouts_total", "Connection checkouts", "counter", labels, pool["checkouts"]
+        yield "oa_db_pool_timeouts_total", "Connection checkout timeouts", "counter", labels, pool["timeouts"]
+    for name, cache in (("responses", response_cache.stats()), ("leave_summaries", summary_cache.stats())):
+        yield "oa_cache_hits_total", "Cache hits", "counter", {"cache": name}, cache["hits"]
+        yield "oa_cache_misses_total", "Cache misses", "counter", {"cache": name}, cache["misses"]
+    llm = llm_stats()
+    yield "oa_llm_throttled_total", "LLM calls rejected by rate limits", "counter", {"scope": "user"}, llm["throttled_user"]
+    yield "oa_llm_throttled_total", "LLM calls rejected by rate limits", "counter", {"scope": "global"}, llm["throttled_global"]
+    yield ("oa_llm_short_circuited_total", "LLM calls rejected by the open circuit breaker", "counter", {},
+           llm["breaker"]["short_circuited"])
+    yield ("oa_llm_breaker_open", "1 while the LLM circuit breaker is open or half-open", "gauge", {},
+           int(llm["breaker"]["state"] != "closed"))
+    notify = notifier.stats()
+    yield "oa_notify_connections", "Connections registered for push events", "gauge", {}, notify["connections"]
+    yield "oa_notify_delivered_total", "Push events delivered to connections", "counter", {}, notify["delivered"]
+
+
+registry.add_collector(_component_metrics)
+
+
+@app.on_event("startup")
+async def _start_notifier():
+    await notifier.start()
+
+
+@app.on_event("shutdown")
+def _shutdown_hash_pool():
+    shutdown_hash_pool()
+
+
+@app.on_event("shutdown")
+async def _close_notifier():
+    await notifier.close()
+
+
+app.add_middleware(MetricsMiddleware)
+
 # CORS 配置
 app.add_middleware(
     CORSMiddleware,
@@ -25,12 +98,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition"],  # 分页的下一页 cursor、导出文件名
 )
 
 
 # 注册路由
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(leave.router, prefix="/leave", tags=["Leave Management"])
+app.include_router(leave.router, prefix="/leave", tags=["Leave Management"], dependencies=[Depends(get_token_claims)])
 app.include_router(websocket.router, prefix="/ws", tags=["WebSocket"])
-app.include_router(employee.router, prefix="/base", tags=["Employee"])
-app.include_router(leave_entitlements.router, prefix="/base", tags=["Leave-Entitlements"])
+app.include_router(employee.router, prefix="/base", tags=["Employee"], dependencies=[Depends(get_token_claims)])
+app.include_router(leave_entitlements.router, prefix="/base", tags=["Leave-Entitlements"], dependencies=[Depends(get_token_claims)])
+app.include_router(report.router, prefix="/report", tags=["Reports"], dependencies=[Depends(get_token_claims)])
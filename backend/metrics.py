@@ -0,0 +1,209 @@
+"""
+Prometheus 文本格式的指标（/metrics），不依赖 prometheus_client。
+
+Counter / Gauge / Histogram 以标签值元组区分序列，记录时只做一次加锁的字典更新；
+其它模块已有的统计（连接池、缓存、限流、推送）通过 add_collector 在输出时读取，不重复计数。
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 延迟直方图的默认分桶（秒）：覆盖 DB 查询的毫秒级到 LLM 调用的数十秒
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # 各分桶的计数（非累计）、总和、总数
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """collector() 返回 [(名称, 说明, 类型, {标签: 值}, 数值), ...]，在每次输出时调用"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        # 同名的序列须连续输出在同一组 HELP / TYPE 之下
+        families = {}
+        for collector in self._collectors:
+            for name, documentation, metric_type, labels, value in collector():
+                family = families.setdefault(name, [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"])
+                names = tuple(labels)
+                family.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+        for family in families.values():
+            lines.extend(family)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# HTTP
+http_request_duration = registry.register(Histogram(
+    "oa_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")))
+
+# 数据库
+db_query_duration = registry.register(Histogram(
+    "oa_db_query_duration_seconds", "SQL statement execution time", ("operation",)))
+
+# LLM
+llm_request_duration = registry.register(Histogram(
+    "oa_llm_request_duration_seconds", "LLM call latency", ("model", "outcome")))
+llm_tokens = registry.register(Counter(
+    "oa_llm_tokens_total", "LLM tokens reported by the API", ("model", "kind")))
+
+# WebSocket
+ws_connections = registry.register(Gauge(
+    "oa_ws_connections", "Open /ws/leave connections", ("protocol",)))
+ws_messages = registry.register(Counter(
+    "oa_ws_messages_total", "/ws/leave messages by type", ("type",)))
+ws_stage_duration = registry.register(Histogram(
+    "oa_ws_stage_duration_seconds", "Leave message handling time per stage", ("stage",)))
+
+
+class MetricsMiddleware:
+    """
+    ASGI 中间件：按路由模板（例如 /base/employees/{emp_id}）记录 HTTP 请求延迟，
+    流式响应计到 body 发送完毕为止；WebSocket 由 /ws/leave 自行记录。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")  # FastAPI 在匹配路由后写入 scope
+            http_request_duration.observe(time.perf_counter() - started, method=scope["method"],
+                                          route=getattr(route, "path", "unmatched"), status=status)
+
+
+def stage(name: str):
+    """记录请假消息处理某一阶段的耗时：routing / extraction / validation / save / summary"""
+    return ws_stage_duration.time(stage=name)
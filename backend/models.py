@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Date, DateTime, Time, Text, DECIMAL
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Date, DateTime, Time, Text, DECIMAL, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -44,6 +44,12 @@ class LeaveRecord(Base):
     note = Column(Text)
     total_hours = Column(DECIMAL(5, 2), default=0)  # 实际请假小时数（新增字段）
 
+    __table_args__ = (
+        Index("ix_leave_records_emp_start", "emp_id", "start_datetime"),  # 员工 + 时间区间查询、重叠检查
+        Index("ix_leave_records_emp_status", "emp_id", "status"),  # 待审批 / 个人记录查询
+        Index("ix_leave_records_start_end", "start_datetime", "end_datetime"),  # 全员时间区间查询
+    )
+
 class WorkSchedule(Base):
     __tablename__ = "work_schedules"
     id = Column(Integer, primary_key=True, index=True)
@@ -67,3 +73,15 @@ class Holiday(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     holiday_date = Column(Date, nullable=False, unique=True)  # 假日日期
     description = Column(String(255), nullable=False)  # 假日描述
+
+
+class LeaveBalance(Base):
+    __tablename__ = "leave_balances"
+
+    # 每位员工每种假别每年一笔，余额检查只需一次主键查询
+    emp_id = Column(String(20), ForeignKey("employees.emp_id"), primary_key=True)
+    leave_type = Column(String(50), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    entitlement_hours = Column(DECIMAL(7, 2), nullable=False, default=0)  # 可请时数
+    used_hours = Column(DECIMAL(7, 2), nullable=False, default=0)         # 已核准时数
+    pending_hours = Column(DECIMAL(7, 2), nullable=False, default=0)      # 申请中时数
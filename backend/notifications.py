@@ -0,0 +1,213 @@
+"""
+请假状态推送：WebSocket 连线登记表 + 发布/订阅总线。
+
+- 员工提出请假（状态变为 requested）时，推送给可审核该员工的主管
+- 请假被核准或驳回时，推送给该员工
+发布端可在任意线程调用 notifier.publish（同步路由在线程池中执行），
+实际投递在事件循环中进行：按 emp_id 查登记表，只写入该员工已开启连线的队列，与在线人数无关。
+多 worker 部署时以 NOTIFY_BACKEND=redis 经由 Redis 频道转发到所有进程。
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from org_chart import org_chart, SUPERVISOR_MAX_DEPTH
+
+NOTIFY_BACKEND = os.getenv("NOTIFY_BACKEND", "memory")  # memory: 单进程; redis: 多 worker 经 Redis 转发
+NOTIFY_REDIS_URL = os.getenv("NOTIFY_REDIS_URL", "redis://localhost:6379/0")
+NOTIFY_REDIS_CHANNEL = os.getenv("NOTIFY_REDIS_CHANNEL", "oasystem:leave-events")
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "100"))  # 每条连线待发送事件上限，超出时丢弃最旧的
+
+logger = logging.getLogger("uvicorn")
+
+
+class Subscriber:
+    """单条 WebSocket 连线的事件队列；由该连线自己的任务取出并发送，慢连线不会拖慢其它连线"""
+
+    def __init__(self, emp_id: str, queue_size: int = NOTIFY_QUEUE_SIZE):
+        self.emp_id = emp_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class ConnectionRegistry:
+    """emp_id -> 该员工目前开启的连线；只在事件循环线程中使用"""
+
+    def __init__(self):
+        self._connections = defaultdict(set)
+        self.delivered = 0
+
+    def register(self, emp_id: str) -> Subscriber:
+        subscriber = Subscriber(emp_id)
+        self._connections[emp_id].add(subscriber)
+        return subscriber
+
+    def unregister(self, subscriber: Subscriber):
+        connections = self._connections.get(subscriber.emp_id)
+        if connections is not None:
+            connections.discard(subscriber)
+            if not connections:
+                del self._connections[subscriber.emp_id]
+
+    def deliver(self, recipients: Iterable[str], event: dict) -> int:
+        count = 0
+        for emp_id in recipients:
+            for subscriber in self._connections.get(emp_id, ()):
+                subscriber.offer(event)
+                count += 1
+        self.delivered += count
+        return count
+
+    def stats(self) -> dict:
+        return {
+            "employees": len(self._connections),
+            "connections": sum(len(c) for c in self._connections.values()),
+            "delivered": self.delivered,
+            "dropped": sum(s.dropped for c in self._connections.values() for s in c),
+        }
+
+
+class PubSubBackend:
+    """
+    跨进程转发接口。start 之后，publish 的消息会在每个进程（含自己）调用一次 on_message。
+    """
+
+    async def start(self, on_message):
+        raise NotImplementedError
+
+    def publish(self, message: dict):
+        """在事件循环线程中调用"""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryPubSub(PubSubBackend):
+    """进程内直接投递，仅适用于单个 uvicorn 进程"""
+
+    async def start(self, on_message):
+        self._on_message = on_message
+
+    def publish(self, message: dict):
+        self._on_message(message)
+
+
+class RedisPubSub(PubSubBackend):
+    """经由 Redis 频道转发到所有 worker，需安装 redis 套件"""
+
+    def __init__(self, url: str = NOTIFY_REDIS_URL, channel: str = NOTIFY_REDIS_CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._tasks = set()
+
+    async def start(self, on_message):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(self.url)
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(on_message))
+
+    async def _listen(self, on_message):
+        async for item in self._pubsub.listen():
+            if item["type"] != "message":
+                continue
+            try:
+                on_message(json.loads(item["data"]))
+            except Exception as e:
+                logger.warning("推送事件處理失敗:%s", e)
+
+    def publish(self, message: dict):
+        task = asyncio.create_task(self._redis.publish(self.channel, json.dumps(message, ensure_ascii=False)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        self._listener.cancel()
+        await self._pubsub.close()
+        await self._redis.close()
+
+
+def create_pubsub_backend(name: str = NOTIFY_BACKEND) -> PubSubBackend:
+    if name == "memory":
+        return MemoryPubSub()
+    if name == "redis":
+        return RedisPubSub()
+    raise ValueError(f"Unknown notify backend: {name}")
+
+
+class Notifier:
+    """
+    连线登记表与发布/订阅后端的组合。应用启动时调用 start 绑定事件循环；
+    未启动（例如命令行脚本）时 publish 直接忽略。
+    """
+
+    def __init__(self, backend: PubSubBackend = None):
+        self.registry = ConnectionRegistry()
+        self.backend = backend or create_pubsub_backend()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self._on_message)
+
+    async def close(self):
+        self._loop = None
+        await self.backend.close()
+
+    def _on_message(self, message: dict):
+        self.registry.deliver(message["to"], message["event"])
+
+    def publish(self, recipients: Iterable[str], event: dict):
+        """把 event 推送给 recipients（emp_id 列表）的所有连线；可在任意线程调用"""
+        recipients = list(recipients)
+        loop = self._loop
+        if not recipients or loop is None:
+            return
+        self.published += 1
+        loop.call_soon_threadsafe(self.backend.publish, {"to": recipients, "event": event})
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, "published": self.published, **self.registry.stats()}
+
+
+notifier = Notifier()
+
+
+def notify_leave_requested(emp_id: str, leave_ids: list, leave_type: str, start_datetime, end_datetime, hours):
+    """员工的请假申请已提交后调用，通知可审核该员工的主管"""
+    notifier.publish(org_chart.supervisors_of(emp_id, SUPERVISOR_MAX_DEPTH), {
+        "event": "leave_requested",
+        "emp_id": emp_id,
+        "leave_ids": leave_ids,
+        "leave_type": leave_type,
+        "start_datetime": str(start_datetime),
+        "end_datetime": str(end_datetime),
+        "hours": float(hours),
+    })
+
+
+def notify_leave_decided(emp_id: str, supervisor_id: str, status: str, leave_ids: list = None, hours=None):
+    """请假被核准（approved）或驳回（cancelled）后通知申请人；批量核准时 leave_ids 可省略"""
+    notifier.publish([emp_id], {
+        "event": "leave_decided",
+        "emp_id": emp_id,
+        "supervisor_id": supervisor_id,
+        "status": status,
+        "leave_ids": leave_ids,
+        "hours": float(hours) if hours is not None else None,
+    })
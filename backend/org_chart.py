@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import EmployeeSupervisor
+
+ORG_CHART_REFRESH_SECONDS = int(os.getenv("ORG_CHART_REFRESH_SECONDS", "600"))  # 定期重新读取 employee_supervisors（秒）
+SUPERVISOR_MAX_DEPTH = int(os.getenv("SUPERVISOR_MAX_DEPTH", "0"))  # 主管可查看/核准的下属层级，0 表示不限
+
+
+class _Closure:
+    """某位主管的所有下属，按层级由近到远排列；level_ends[d-1] 为第 d 层结束的位置，depths 为各下属所在层级"""
+
+    __slots__ = ("subordinates", "level_ends", "depths")
+
+    def __init__(self, subordinates: tuple, level_ends: list, depths: dict):
+        self.subordinates = subordinates
+        self.level_ends = level_ends
+        self.depths = depths
+
+
+class OrgChart:
+    """
+    组织图索引：由 employee_supervisors 建立邻接表，并预先计算每位主管的传递闭包。
+    - 「X 的 k 层以内所有下属」只需一次切片，不必每次查询数据库
+    - 允许一人有多位主管；资料中出现循环时每人只计入一次（取最短层级）
+    - employee_supervisors 通过 ORM 变更并 commit 后立即失效，另外每 refresh_seconds 秒重新读取一次
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_seconds: int = ORG_CHART_REFRESH_SECONDS):
+        self._session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._closures = None
+        self._supervisors = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._closures = None
+            self._supervisors = None
+
+    def _load_edges(self) -> list:
+        db = self._session_factory()
+        try:
+            return db.query(EmployeeSupervisor.supervisor_id, EmployeeSupervisor.emp_id).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _build(edges: list) -> dict:
+        children = defaultdict(list)
+        for supervisor_id, emp_id in edges:
+            if emp_id != supervisor_id:
+                children[supervisor_id].append(emp_id)
+
+        closures = {}
+        for root in children:
+            # BFS 逐层展开，visited 同时处理多位主管与循环
+            visited = {root}
+            ordered, level_ends, depths = [], [], {}
+            frontier = deque([root])
+            while frontier:
+                next_frontier = deque()
+                for node in frontier:
+                    for child in children.get(node, ()):
+                        if child not in visited:
+                            visited.add(child)
+                            ordered.append(child)
+                            depths[child] = len(level_ends) + 1
+                            next_frontier.append(child)
+                if next_frontier:
+                    level_ends.append(len(ordered))
+                frontier = next_frontier
+            closures[root] = _Closure(tuple(ordered), level_ends, depths)
+        return closures
+
+    @staticmethod
+    def _build_supervisors(closures: dict) -> dict:
+        """反向索引：员工 -> [(主管, 层级)]，由传递闭包直接得到"""
+        supervisors = defaultdict(list)
+        for supervisor_id, closure in closures.items():
+            for emp_id, depth in closure.depths.items():
+                supervisors[emp_id].append((supervisor_id, depth))
+        return dict(supervisors)
+
+    def _load(self):
+        with self._lock:
+            if self._closures is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+                self._closures = self._build(self._load_edges())
+                self._supervisors = self._build_supervisors(self._closures)
+                self._loaded_at = time.monotonic()
+            return self._closures, self._supervisors
+
+    def _get(self) -> dict:
+        return self._load()[0]
+
+    def subordinates(self, supervisor_id: str, max_depth: Optional[int] = None) -> tuple:
+        """supervisor_id 的 max_depth 层以内所有下属（None 或 0 表示不限层级），按层级由近到远排列"""
+        closure = self._get().get(supervisor_id)
+        if closure is None:
+            return ()
+        if not max_depth or max_depth >= len(closure.level_ends):
+            return closure.subordinates
+        return closure.subordinates[:closure.level_ends[max_depth - 1]]
+
+    def depth_of(self, supervisor_id: str, emp_id: str) -> Optional[int]:
+        """emp_id 位于 supervisor_id 之下第几层，不是其下属时返回 None"""
+        closure = self._get().get(supervisor_id)
+        return closure.depths.get(emp_id) if closure is not None else None
+
+    def supervisors_of(self, emp_id: str, max_depth: Optional[int] = None) -> list:
+        """可审核 emp_id 的所有主管（max_depth 层以内），按层级由近到远排列"""
+        entries = self._load()[1].get(emp_id, ())
+        return [supervisor_id for supervisor_id, depth in sorted(entries, key=lambda e: e[1])
+                if not max_depth or depth <= max_depth]
+
+    def is_subordinate(self, supervisor_id: str, emp_id: str, max_depth: Optional[int] = None) -> bool:
+        depth = self.depth_of(supervisor_id, emp_id)
+        return depth is not None and (not max_depth or depth <= max_depth)
+
+    def stats(self) -> dict:
+        closures = self._get()
+        return {
+            "supervisors": len(closures),
+            "closure_size": sum(len(c.subordinates) for c in closures.values()),
+            "max_depth": max((len(c.level_ends) for c in closures.values()), default=0),
+        }
+
+
+org_chart = OrgChart()
+
+
+# flush 时只在 session.info 记下「employee_supervisors 有变更」，等 commit 之后才失效：
+# 若在 flush 时就失效，其它请求可能在 commit 前重新读取到旧资料并缓存下来
+@event.listens_for(Session, "after_flush")
+def _mark_org_chart_dirty(session, flush_context):
+    if any(isinstance(instance, EmployeeSupervisor) for instance in (*session.new, *session.dirty, *session.deleted)):
+        session.info["org_chart_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_org_chart(session):
+    if session.info.pop("org_chart_dirty", False):
+        org_chart.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_org_chart_dirty(session):
+    session.info.pop("org_chart_dirty", None)
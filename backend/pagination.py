@@ -0,0 +1,53 @@
+import os
+from typing import Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from database import SessionLocal
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_SIZE = 1000
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))  # 单页 limit 的上限
+
+
+def _after_cursor(query, id_column, cursor: Optional[int]):
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    return query.order_by(id_column)
+
+
+def paginate(query, id_column, cursor: Optional[int], limit: Optional[int], response: Response):
+    """
+    按主键做 keyset 分页：返回 id > cursor 的前 limit 笔。
+    还有下一页时在响应头 X-Next-Cursor 中返回下一页的 cursor；未指定 limit 时返回全部，
+    指定时限制在 1 ~ MAX_PAGE_SIZE 之间。
+    """
+    query = _after_cursor(query, id_column, cursor)
+    if limit is None:
+        return query.all()
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    return rows
+
+
+def stream_ndjson(build_query, id_column, cursor: Optional[int], schema,
+                  batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    以 NDJSON 逐行输出 id > cursor 的查询结果，使用服务端游标分批读取，内存占用与结果总数无关。
+    build_query(db) 返回要执行的 Query；流式输出期间使用独立的 Session。
+    """
+    def generate():
+        db = SessionLocal()
+        try:
+            query = _after_cursor(build_query(db), id_column, cursor)
+            for row in query.yield_per(batch_size):
+                yield schema.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,25 @@
+"""
+从 leave_records 与 leave_entitlements 重建 leave_balances 余额账本。
+
+用法:
+    python reconcile_balances.py [--batch-size 5000]
+"""
+import argparse
+import time
+
+from database import SessionLocal
+from leave_balance import rebuild_balances
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild leave_balances from leave_records")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        count = rebuild_balances(db, args.batch_size)
+        db.commit()
+    finally:
+        db.close()
+    print(f"rebuilt {count} balances in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from pagination import NEXT_CURSOR_HEADER
+
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))  # 缓存有效秒数；多 worker 时也是其它进程写入后的最长延迟
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+
+CACHED_HEADERS = (NEXT_CURSOR_HEADER,)  # 随响应一起缓存的响应头
+
+
+class _Entry:
+    __slots__ = ("namespace", "body", "etag", "headers", "created")
+
+    def __init__(self, namespace: str, body: bytes, etag: str, headers: dict):
+        self.namespace = namespace
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.created = time.monotonic()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """
+    读取类 API 的响应缓存：以 namespace + 路径 + 查询参数为键，保存序列化后的 JSON 与 ETag。
+    - 请求带 If-None-Match 且与当前 ETag 相同时返回 304，不含 body
+    - 写入类 API 调用 invalidate(namespace) 立即清除本进程中该 namespace 的缓存
+    - 其它 worker 的写入要等 TTL 过期后才会反映
+    """
+
+    def __init__(self, ttl: int = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._adapters = {}
+        self._generations = {}  # namespace -> 失效次数，用来识别 build 期间发生的写入
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def _generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def _put(self, key, entry: _Entry, generation: int):
+        with self._lock:
+            if self._generations.get(entry.namespace, 0) != generation:
+                return  # build 期间该 namespace 已失效，读到的可能是旧资料，不写入缓存
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _serialize(self, response_type, data) -> bytes:
+        adapter = self._adapters.get(response_type)
+        if adapter is None:
+            adapter = self._adapters[response_type] = TypeAdapter(response_type)
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+    def respond(self, request: Request, namespace: str, response_type,
+                build: Callable[[Response], Any]) -> Response:
+        """
+        返回缓存的响应，未命中时调用 build(response) 取得资料并按 response_type 序列化后缓存。
+        build 抛出的 HTTPException（例如 404）不会被缓存。
+        """
+        key = (namespace, request.url.path, request.url.query)
+        entry = self._get(key)
+        if entry is None:
+            generation = self._generation(namespace)
+            scratch = Response()
+            body = self._serialize(response_type, build(scratch))
+            headers = {name: scratch.headers[name] for name in CACHED_HEADERS if name in scratch.headers}
+            entry = _Entry(namespace, body, f'"{hashlib.sha1(body).hexdigest()}"', headers)
+            self._put(key, entry, generation)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **entry.headers}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *namespaces: str):
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry.namespace in namespaces]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
@@ -1,14 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException,Form
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_async_db, release_connection, run_sync
 from models import Employee
-from utils import verify_password
+from rate_limit import KeyedRateLimiter
+from utils import create_access_token, verify_and_update_password_async
+
+# 登录限流：同一帐号与同一来源 IP 各自的令牌桶（每分钟补充次数 / 可连续尝试次数）
+LOGIN_RATE_PER_EMAIL = float(os.getenv("LOGIN_RATE_PER_EMAIL", "10"))
+LOGIN_BURST_PER_EMAIL = float(os.getenv("LOGIN_BURST_PER_EMAIL", "5"))
+LOGIN_RATE_PER_IP = float(os.getenv("LOGIN_RATE_PER_IP", "120"))
+LOGIN_BURST_PER_IP = float(os.getenv("LOGIN_BURST_PER_IP", "60"))
+
+email_limiter = KeyedRateLimiter(LOGIN_RATE_PER_EMAIL / 60, LOGIN_BURST_PER_EMAIL)
+ip_limiter = KeyedRateLimiter(LOGIN_RATE_PER_IP / 60, LOGIN_BURST_PER_IP)
 
 router = APIRouter()
 
+
+def _save_password_hash(db: Session, user: Employee, new_hash: str):
+    # user 已随 release_connection 脱离 Session，以 UPDATE 语句写回
+    db.query(Employee).filter(Employee.id == user.id).update({Employee.login_password: new_hash})
+    db.commit()
+
+
 @router.post("/login")
-def login(email: str=Form(...), password: str=Form(...), db: Session = Depends(get_db)):
-    user = db.query(Employee).filter(Employee.email == email).first()
-    if not user or not verify_password(password, user.login_password):
+async def login(request: Request, email: str=Form(...), password: str=Form(...), db=Depends(get_async_db)):
+    client_ip = request.client.host if request.client else "unknown"
+    if not ip_limiter.allow(client_ip) or not email_limiter.allow(email.lower()):
+        raise HTTPException(status_code=429, detail="Too many login attempts")
+
+    user = await run_sync(db, lambda session: session.query(Employee).filter(Employee.email == email).first())
+    if not user:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    await release_connection(db)  # 等待 bcrypt 期间不占用连接
+
+    # bcrypt 在进程池中执行；哈希成本与目前设定不同时顺便更新为新哈希
+    valid, new_hash = await verify_and_update_password_async(password, user.login_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    return {"message": "Login successful", "emp_id": user.emp_id,"emp_name":user.name,"annual":user.annual_leave_days,"sick":user.sick_leave_days}
+    if new_hash:
+        await run_sync(db, _save_password_hash, user, new_hash)
+    access_token = create_access_token({"sub": user.emp_id, "emp_id": user.emp_id})
+    return {"message": "Login successful", "access_token": access_token, "token_type": "bearer", "emp_id": user.emp_id,"emp_name":user.name,"annual":user.annual_leave_days,"sick":user.sick_leave_days}
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from models import Employee
 from schemas import EmployeeCreate, EmployeeUpdate, EmployeeResponse, LeaveEntitlementCreate, LeaveEntitlementUpdate, \
     LeaveEntitlementUpdate, ChangePasswordRequest
-from database import get_db
-from typing import List
-from utils import hash_password, verify_password
+from database import get_async_db, get_db
+from bulk_import import FORMATS, EmployeeImporter, aiter_lines, request_format, run_import_async
+from typing import List, Optional
+from utils import hash_password_pooled, verify_password_pooled
+from pagination import MAX_PAGE_SIZE, paginate, stream_ndjson
+from response_cache import response_cache
 
 router = APIRouter()
 
@@ -14,26 +17,54 @@ router = APIRouter()
 @router.post("/employees", response_model=EmployeeResponse)
 def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     db_employee = Employee(**employee.dict())
-    db_employee.login_password = hash_password(employee.login_password)
+    db_employee.login_password = hash_password_pooled(employee.login_password)
     db.add(db_employee)
     db.commit()
+    response_cache.invalidate("employees")
     db.refresh(db_employee)
     return db_employee
 
 
+# 批量导入员工
+@router.post("/employees/import")
+async def import_employees(request: Request, format: Optional[str] = None, db=Depends(get_async_db)):
+    """
+    以 CSV（第一行为栏位名称）或 NDJSON 批量导入员工，请求 body 边接收边处理。
+    返回导入笔数、失败行号与原因，以及每秒处理行数。
+    """
+    fmt = request_format(format, request.headers.get("content-type"))
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+    result = await run_import_async(EmployeeImporter(fmt), aiter_lines(request.stream()), db)
+    response_cache.invalidate("employees")
+    return result
+
+
 # 查询所有员工
 @router.get("/employees", response_model=List[EmployeeResponse])
-def get_employees(db: Session = Depends(get_db)):
-    return db.query(Employee).all()
+def get_employees(request: Request, cursor: Optional[int] = None,
+                  limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                  stream: bool = False, db: Session = Depends(get_db)):
+    """
+    查询所有员工。可用 limit/cursor 分页（下一页 cursor 见 X-Next-Cursor 响应头），
+    stream=true 时以 NDJSON 流式输出。非流式结果会缓存并支持 ETag / If-None-Match。
+    """
+    if stream:
+        return stream_ndjson(lambda session: session.query(Employee), Employee.id, cursor, EmployeeResponse)
+    return response_cache.respond(request, "employees", List[EmployeeResponse],
+                                  lambda response: paginate(db.query(Employee), Employee.id, cursor, limit, response))
 
 
 # 查询特定员工
 @router.get("/employees/{emp_id}", response_model=EmployeeResponse)
-def get_employee(emp_id: str, db: Session = Depends(get_db)):
-    employee = db.query(Employee).filter(Employee.id == emp_id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    return employee
+def get_employee(emp_id: str, request: Request, db: Session = Depends(get_db)):
+    def load(response: Response):
+        employee = db.query(Employee).filter(Employee.id == emp_id).first()
+        if not employee:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        return employee
+
+    return response_cache.respond(request, "employees", EmployeeResponse, load)
 
 
 # 更新员工
@@ -45,6 +76,7 @@ def update_employee(emp_id: str, updated_employee: EmployeeUpdate, db: Session =
     for key, value in updated_employee.dict(exclude_unset=True).items():
         setattr(employee, key, value)
     db.commit()
+    response_cache.invalidate("employees")
     db.refresh(employee)
     return employee
 
@@ -58,11 +90,11 @@ def change_password(request: ChangePasswordRequest, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Employee not found")
 
     # 验证旧密码
-    if not verify_password(request.old_password, employee.login_password):
+    if not verify_password_pooled(request.old_password, employee.login_password):
         raise HTTPException(status_code=400, detail="Old password is incorrect")
 
     # 更新密码
-    employee.login_password = hash_password(request.new_password)
+    employee.login_password = hash_password_pooled(request.new_password)
     db.commit()
     return {"detail": "Password updated successfully"}
 
@@ -75,4 +107,5 @@ def delete_employee(emp_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Employee not found")
     db.delete(employee)
     db.commit()
+    response_cache.invalidate("employees")
     return {"detail": "Employee deleted"}
@@ -1,29 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from collections import defaultdict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from schemas import LeaveResponse
+from schemas import LeaveResponse, LeaveBatchDecisionRequest, LeaveBatchDecisionResponse
 
-from database import get_db
-from models import LeaveRecord, LeaveEntitlement
-from typing import List
+from database import get_async_db, get_db, run_sync
+from models import LeaveRecord, Employee
+from leave_approval import apply_decisions
+from leave_balance import remaining_hours
+from notifications import notify_leave_decided
+from pagination import MAX_PAGE_SIZE, paginate, stream_ndjson
+from work_calendar import work_calendar
+from work_hours import make_shift, leave_hours
+from utils import require_token_claims
+from typing import List, Optional
 from datetime import datetime
 
-
+MAX_BATCH_DECISIONS = int(os.getenv("MAX_BATCH_DECISIONS", "20000"))  # 单次批量审核的最大笔数
 
 router = APIRouter()
 
 @router.post("/leave")
 def request_leave(emp_id: str, leave_type: str, start_datetime: str, end_datetime: str, db: Session = Depends(get_db)):
-    entitlement = db.query(LeaveEntitlement).filter_by(emp_id=emp_id, leave_type=leave_type).first()
-    if not entitlement or entitlement.entitlement_days <= 0:
+    try:
+        start = datetime.fromisoformat(start_datetime)
+        end = datetime.fromisoformat(end_datetime)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid datetime format")
+    employee = db.query(Employee).filter(Employee.emp_id == emp_id).first()
+    shift = make_shift(employee.work_start_time, employee.work_end_time) if employee else make_shift()
+    hours = leave_hours(start, end, shift, work_calendar)
+
+    # 余额账本按 (emp_id, leave_type, year) 主键查询
+    remaining = remaining_hours(db, emp_id, leave_type, start.year)
+    if remaining is None or remaining < hours:
         raise HTTPException(status_code=400, detail="Insufficient leave balance")
-    leave = LeaveRecord(emp_id=emp_id, leave_type=leave_type, start_datetime=start_datetime, end_datetime=end_datetime)
+    leave = LeaveRecord(emp_id=emp_id, leave_type=leave_type, start_datetime=start, end_datetime=end,
+                        total_hours=hours)
     db.add(leave)
     db.commit()
     return {"message": "Leave requested"}
 
 
 
+# 批量审核请假
+@router.post("/leave-records/decisions", response_model=LeaveBatchDecisionResponse)
+def decide_leave_requests(request: LeaveBatchDecisionRequest, claims: dict = Depends(require_token_claims),
+                          db: Session = Depends(get_db)):
+    """
+    主管对多笔请假逐笔核准（approve）或驳回（reject），在同一事务内更新状态与余额。
+    必须带 token，审核者即 token 中的 emp_id；只能审核自己（含多层）下属的待审核申请，
+    不符合的项目在结果中标示原因，其余照常套用。
+    """
+    supervisor_id = claims["emp_id"]
+    if len(request.decisions) > MAX_BATCH_DECISIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_DECISIONS} decisions per request")
+
+    results = apply_decisions(db, supervisor_id, [(d.leave_id, d.decision) for d in request.decisions])
+    db.commit()
+
+    applied = [r for r in results if r["error"] is None]
+    # 按 (申请人, 新状态) 合并，每位申请人每种结果只推送一次
+    decided = defaultdict(list)
+    for r in applied:
+        decided[(r["emp_id"], r["status"])].append(r["leave_id"])
+    for (emp_id, status), leave_ids in decided.items():
+        notify_leave_decided(emp_id, supervisor_id, status, leave_ids)
+
+    return {
+        "approved": sum(1 for r in applied if r["decision"] == "approve"),
+        "rejected": sum(1 for r in applied if r["decision"] == "reject"),
+        "failed": len(results) - len(applied),
+        "results": results,
+    }
+
+
 # 查询特定员工在特定时间区间内的请假数据
 @router.get("/leave-records/{emp_id}/time-range", response_model=List[LeaveResponse])
 def get_leave_records_by_employee_and_time(
@@ -49,21 +102,32 @@ def get_leave_records_by_employee_and_time(
 
 # 查询所有员工在特定时间区间内的请假数据
 @router.get("/leave-records/time-range", response_model=List[LeaveResponse])
-def get_leave_records_by_time(
+async def get_leave_records_by_time(
     start_date: datetime,
     end_date: datetime,
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    db=Depends(get_async_db)
 ):
     """
     查询所有员工在特定时间区间内的请假数据。
+    可用 limit/cursor 分页（下一页 cursor 见 X-Next-Cursor 响应头），stream=true 时以 NDJSON 流式输出。
     """
-    records = db.query(LeaveRecord).filter(
-        and_(
-            LeaveRecord.start_datetime >= start_date,
-            LeaveRecord.end_datetime <= end_date
+    def build_query(session: Session):
+        return session.query(LeaveRecord).filter(
+            and_(
+                LeaveRecord.start_datetime >= start_date,
+                LeaveRecord.end_datetime <= end_date
+            )
         )
-    ).all()
 
-    if not records:
+    if stream:
+        return stream_ndjson(build_query, LeaveRecord.id, cursor, LeaveResponse)
+
+    records = await run_sync(db, lambda session: paginate(build_query(session), LeaveRecord.id, cursor, limit, response))
+
+    if not records and cursor is None:
         raise HTTPException(status_code=404, detail="No leave records found for the specified time range")
     return records
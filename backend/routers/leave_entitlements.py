@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from models import LeaveEntitlement, Employee
 from schemas import LeaveEntitlementCreate, LeaveEntitlementUpdate, LeaveEntitlementResponse
-from database import get_db
-from typing import List
+from database import get_async_db, get_db
+from bulk_import import FORMATS, LeaveEntitlementImporter, aiter_lines, request_format, run_import_async
+from leave_balance import sync_entitlement
+from pagination import MAX_PAGE_SIZE, paginate, stream_ndjson
+from response_cache import response_cache
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -16,22 +20,54 @@ def create_leave_entitlement(entitlement: LeaveEntitlementCreate, db: Session =
 
     db_entitlement = LeaveEntitlement(**entitlement.dict())
     db.add(db_entitlement)
+    db.flush()
+    sync_entitlement(db, db_entitlement.emp_id, db_entitlement.leave_type)
     db.commit()
+    response_cache.invalidate("leave_entitlements")
     db.refresh(db_entitlement)
     return db_entitlement
 
+# 批量导入员工假数
+@router.post("/leave-entitlements/import")
+async def import_leave_entitlements(request: Request, format: Optional[str] = None, db=Depends(get_async_db)):
+    """
+    以 CSV（第一行为栏位名称）或 NDJSON 批量导入员工假数，请求 body 边接收边处理。
+    返回导入笔数、失败行号与原因，以及每秒处理行数。
+    """
+    fmt = request_format(format, request.headers.get("content-type"))
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+    result = await run_import_async(LeaveEntitlementImporter(fmt), aiter_lines(request.stream()), db)
+    response_cache.invalidate("leave_entitlements")
+    return result
+
+
 # 查询所有员工的假数
 @router.get("/leave-entitlements", response_model=List[LeaveEntitlementResponse])
-def get_all_leave_entitlements(db: Session = Depends(get_db)):
-    return db.query(LeaveEntitlement).all()
+def get_all_leave_entitlements(request: Request, cursor: Optional[int] = None,
+                               limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                               stream: bool = False, db: Session = Depends(get_db)):
+    """
+    查询所有员工的假数。可用 limit/cursor 分页（下一页 cursor 见 X-Next-Cursor 响应头），
+    stream=true 时以 NDJSON 流式输出。非流式结果会缓存并支持 ETag / If-None-Match。
+    """
+    if stream:
+        return stream_ndjson(lambda session: session.query(LeaveEntitlement), LeaveEntitlement.id, cursor,
+                             LeaveEntitlementResponse)
+    return response_cache.respond(
+        request, "leave_entitlements", List[LeaveEntitlementResponse],
+        lambda response: paginate(db.query(LeaveEntitlement), LeaveEntitlement.id, cursor, limit, response))
 
 # 查询特定员工的假数
 @router.get("/leave-entitlements/{emp_id}", response_model=List[LeaveEntitlementResponse])
-def get_leave_entitlements_by_employee(emp_id: str, db: Session = Depends(get_db)):
-    entitlements = db.query(LeaveEntitlement).filter(LeaveEntitlement.emp_id == emp_id).all()
-    if not entitlements:
-        raise HTTPException(status_code=404, detail="Leave entitlements not found")
-    return entitlements
+def get_leave_entitlements_by_employee(emp_id: str, request: Request, db: Session = Depends(get_db)):
+    def load(response: Response):
+        entitlements = db.query(LeaveEntitlement).filter(LeaveEntitlement.emp_id == emp_id).all()
+        if not entitlements:
+            raise HTTPException(status_code=404, detail="Leave entitlements not found")
+        return entitlements
+
+    return response_cache.respond(request, "leave_entitlements", List[LeaveEntitlementResponse], load)
 
 # 更新员工假数
 @router.put("/leave-entitlements/{id}", response_model=LeaveEntitlementResponse)
@@ -39,9 +75,15 @@ def update_leave_entitlement(id: int, entitlement: LeaveEntitlementUpdate, db: S
     db_entitlement = db.query(LeaveEntitlement).filter(LeaveEntitlement.id == id).first()
     if not db_entitlement:
         raise HTTPException(status_code=404, detail="Leave entitlement not found")
+    old_leave_type = db_entitlement.leave_type
     for key, value in entitlement.dict(exclude_unset=True).items():
         setattr(db_entitlement, key, value)
+    db.flush()
+    sync_entitlement(db, db_entitlement.emp_id, db_entitlement.leave_type)
+    if old_leave_type != db_entitlement.leave_type:
+        sync_entitlement(db, db_entitlement.emp_id, old_leave_type)
     db.commit()
+    response_cache.invalidate("leave_entitlements")
     db.refresh(db_entitlement)
     return db_entitlement
 
@@ -52,5 +94,8 @@ def delete_leave_entitlement(id: int, db: Session = Depends(get_db)):
     if not db_entitlement:
         raise HTTPException(status_code=404, detail="Leave entitlement not found")
     db.delete(db_entitlement)
+    db.flush()
+    sync_entitlement(db, db_entitlement.emp_id, db_entitlement.leave_type)
     db.commit()
+    response_cache.invalidate("leave_entitlements")
     return {"detail": "Leave entitlement deleted"}
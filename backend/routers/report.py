@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, get_db
+from leave_report import (GROUP_COLUMNS, PERIODS, REPORT_STATUSES, export_csv, export_ndjson, export_rows,
+                          summarize)
+
+router = APIRouter()
+
+
+def _check_range(start_date: datetime, end_date: datetime):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be later than end_date")
+
+
+# 请假时数汇总
+@router.get("/leave-summary")
+def get_leave_summary(
+    start_date: datetime,
+    end_date: datetime,
+    group_by: List[str] = Query(["emp_id", "leave_type"]),
+    period: Optional[str] = None,
+    status: List[str] = Query(list(REPORT_STATUSES)),
+    db: Session = Depends(get_db),
+):
+    """
+    在数据库中汇总时间区间内（按开始时间）的请假时数。
+    group_by 可重复指定 emp_id / leave_type / department，period 可为 day / week / month（周以星期一表示）。
+    没有资料时返回空列表。
+    """
+    _check_range(start_date, end_date)
+    unknown = [column for column in group_by if column not in GROUP_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported group_by: {', '.join(unknown)}")
+    if period is not None and period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"Unsupported period: {period}")
+    return summarize(db, start_date, end_date, group_by, period, status)
+
+
+# 请假明细导出
+@router.get("/leave-records/export")
+def export_leave_records(
+    start_date: datetime,
+    end_date: datetime,
+    format: str = "csv",
+    status: List[str] = Query(list(REPORT_STATUSES)),
+):
+    """
+    以 CSV 或 NDJSON 流式导出时间区间内的请假明细（含员工姓名与部门）。
+    使用服务端游标分批读取，内存占用与结果总数无关。
+    """
+    _check_range(start_date, end_date)
+    encoders = {"csv": (export_csv, "text/csv; charset=utf-8"), "ndjson": (export_ndjson, "application/x-ndjson")}
+    if format not in encoders:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    encode, media_type = encoders[format]
+
+    def generate():
+        # 流式输出期间使用独立的 Session
+        db = SessionLocal()
+        try:
+            yield from encode(export_rows(db, start_date, end_date, status))
+        finally:
+            db.close()
+
+    filename = f"leave_records_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{format}"
+    return StreamingResponse(generate(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
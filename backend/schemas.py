@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr,Field
 from datetime import datetime, time
+from decimal import Decimal
 
 
 
@@ -121,10 +122,35 @@ class LeaveResponse(BaseModel):
     end_datetime: datetime
     status: str
     note: str = None
+    total_hours: Optional[Decimal] = None
 
     class Config:
         orm_mode = True
 
+# 批量审核模型
+class LeaveDecision(BaseModel):
+    leave_id: int
+    decision: str = Field(..., example="approve")  # approve / reject
+
+
+class LeaveBatchDecisionRequest(BaseModel):
+    decisions: List[LeaveDecision]
+
+
+class LeaveDecisionResult(BaseModel):
+    leave_id: int
+    emp_id: Optional[str] = None
+    decision: str
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class LeaveBatchDecisionResponse(BaseModel):
+    approved: int
+    rejected: int
+    failed: int
+    results: List[LeaveDecisionResult]
+
 # 上下班时间模型
 class WorkScheduleBase(BaseModel):
     emp_id: str
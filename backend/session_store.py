@@ -0,0 +1,332 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+# 对话存储配置
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))  # 最多保留的会话数，超出按 LRU 淘汰
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", "1800"))  # 会话闲置过期时间（秒）
+CHAT_MAX_TURNS = int(os.getenv("CHAT_MAX_TURNS", "6"))  # 完整保留的最近对话轮数
+CHAT_MAX_PROMPT_TOKENS = int(os.getenv("CHAT_MAX_PROMPT_TOKENS", "1500"))  # 单次 prompt 的 token 预算
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")  # memory: 单进程; sqlite: 多 worker 共享
+CHAT_SESSION_DB = os.getenv("CHAT_SESSION_DB", "chat_sessions.db")  # sqlite 后端的数据库文件
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符按 1 个 token，其余字符按 4 个字符 1 个 token"""
+    cjk = sum(1 for ch in text if ord(ch) > 0x2E80)
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class ChatSession:
+    def __init__(self, turns=None, confirm=None, last_access=None):
+        self.turns = turns or []  # [(user_input, assistant_reply), ...]
+        self.confirm = confirm or {}  # 待确认的请假资讯
+        self.last_access = last_access or time.time()
+
+
+class SessionBackend:
+    """
+    会话状态存储后端接口。
+    实现需自行处理闲置过期（ttl）与数量上限（max_sessions）。
+    blocking 为 True 的后端会做阻塞 I/O，在事件循环中须经 ConversationStore.run 交给线程池执行。
+    """
+
+    blocking = False
+
+    def load(self, emp_id: str) -> Optional[ChatSession]:
+        raise NotImplementedError
+
+    def save(self, emp_id: str, session: ChatSession):
+        raise NotImplementedError
+
+    def update(self, emp_id: str, mutate: Callable[[ChatSession], bool]):
+        """
+        读取会话（不存在时为新会话）、调用 mutate 修改后写回，整个过程不被其它写入打断；
+        mutate 返回 False 时不写回。
+        """
+        raise NotImplementedError
+
+    def delete(self, emp_id: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class MemorySessionBackend(SessionBackend):
+    """进程内存储，仅适用于单个 uvicorn 进程"""
+
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, ttl: int = CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expire(self):
+        now = time.time()
+        # OrderedDict 按最近访问排序，过期的会话都在最前面
+        while self._sessions:
+            emp_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.ttl:
+                break
+            del self._sessions[emp_id]
+            self.expirations += 1
+
+    def load(self, emp_id: str) -> Optional[ChatSession]:
+        self._expire()
+        session = self._sessions.get(emp_id)
+        if session is not None:
+            session.last_access = time.time()
+            self._sessions.move_to_end(emp_id)
+        return session
+
+    def save(self, emp_id: str, session: ChatSession):
+        session.last_access = time.time()
+        self._sessions[emp_id] = session
+        self._sessions.move_to_end(emp_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, emp_id: str, mutate: Callable[[ChatSession], bool]):
+        # 只在单一进程的事件循环中调用，读改写之间不会切换
+        session = self.load(emp_id) or ChatSession()
+        if mutate(session) is not False:
+            self.save(emp_id, session)
+
+    def delete(self, emp_id: str):
+        self._sessions.pop(emp_id, None)
+
+    def stats(self) -> dict:
+        self._expire()
+        memory = sum(
+            sys.getsizeof(user) + sys.getsizeof(reply)
+            for session in self._sessions.values() for user, reply in session.turns
+        )
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "turns": sum(len(session.turns) for session in self._sessions.values()),
+            "memory_bytes": memory,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    基于 SQLite 文件的跨进程存储，多个 uvicorn worker 共享同一个文件即可共享会话。
+    读改写在 BEGIN IMMEDIATE 事务内进行，不同 worker 同时修改同一会话时不会丢失更新。
+    """
+
+    blocking = True
+    PRUNE_EVERY = 100  # 每写入多少次清理一次过期与超额会话
+
+    def __init__(self, path: str = CHAT_SESSION_DB, max_sessions: int = CHAT_MAX_SESSIONS,
+                 ttl: int = CHAT_SESSION_TTL):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            "emp_id TEXT PRIMARY KEY, turns TEXT NOT NULL, confirm TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_sessions_last_access ON chat_sessions (last_access)")
+
+    def _load(self, emp_id: str) -> Optional[ChatSession]:
+        row = self._conn.execute(
+            "SELECT turns, confirm, last_access FROM chat_sessions WHERE emp_id = ? AND last_access > ?",
+            (emp_id, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        turns = [tuple(turn) for turn in json.loads(row[0])]
+        return ChatSession(turns=turns, confirm=json.loads(row[1]), last_access=row[2])
+
+    def _save(self, emp_id: str, session: ChatSession):
+        session.last_access = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO chat_sessions (emp_id, turns, confirm, last_access) VALUES (?, ?, ?, ?)",
+            (emp_id, json.dumps(session.turns, ensure_ascii=False),
+             json.dumps(session.confirm, ensure_ascii=False), session.last_access),
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+
+    def load(self, emp_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            return self._load(emp_id)
+
+    def save(self, emp_id: str, session: ChatSession):
+        with self._lock:
+            self._save(emp_id, session)
+
+    def update(self, emp_id: str, mutate: Callable[[ChatSession], bool]):
+        with self._lock:
+            # IMMEDIATE 事务一开始就取得写锁，其它进程的读改写须等本次提交后才能读取
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                session = self._load(emp_id) or ChatSession()
+                if mutate(session) is not False:
+                    self._save(emp_id, session)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM chat_sessions WHERE last_access <= ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM chat_sessions WHERE emp_id IN ("
+            "SELECT emp_id FROM chat_sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        )
+
+    def delete(self, emp_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_sessions WHERE emp_id = ?", (emp_id,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._prune()
+            sessions, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(turns) + LENGTH(confirm)), 0) FROM chat_sessions"
+            ).fetchone()
+        return {"backend": "sqlite", "path": self.path, "sessions": sessions, "memory_bytes": size}
+
+
+def create_session_backend(name: str = CHAT_SESSION_BACKEND) -> SessionBackend:
+    if name == "memory":
+        return MemorySessionBackend()
+    if name == "sqlite":
+        return SQLiteSessionBackend()
+    raise ValueError(f"Unknown session backend: {name}")
+
+
+class ConversationStore:
+    """
+    请假助理的对话存储，按 emp_id 保存对话轮次与待确认资讯，实际状态保存在 SessionBackend 中。
+    组装 prompt 时只完整保留最近 max_turns 轮，更早的轮次压缩为用户输入摘要，
+    并在超出 token 预算时继续丢弃最旧的内容。
+    """
+
+    def __init__(self, backend: SessionBackend = None, max_turns: int = CHAT_MAX_TURNS,
+                 max_prompt_tokens: int = CHAT_MAX_PROMPT_TOKENS):
+        self.backend = backend or create_session_backend()
+        self.max_turns = max_turns
+        self.max_prompt_tokens = max_prompt_tokens
+        self.prompt_calls = 0
+        self.prompt_tokens_total = 0
+        self.prompt_tokens_last = 0
+
+    async def run(self, method, *args):
+        """
+        在事件循环中调用本对象的方法，例如 await conversations.run(conversations.set_confirm, emp_id, data)。
+        会阻塞的后端（sqlite，跨进程锁等待可达数秒）交给线程池执行，内存后端直接调用。
+        """
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    def _get(self, emp_id: str) -> ChatSession:
+        return self.backend.load(emp_id) or ChatSession()
+
+    def append_turn(self, emp_id: str, user_input: str, reply: str):
+        def mutate(session: ChatSession):
+            session.turns.append((user_input, reply))
+            # 只保留有限的旧轮次用于摘要，避免单个会话无限增长
+            del session.turns[:-self.max_turns * 4 or None]
+
+        self.backend.update(emp_id, mutate)
+
+    def get_confirm(self, emp_id: str) -> dict:
+        return self._get(emp_id).confirm
+
+    def take_confirm(self, emp_id: str) -> dict:
+        """取出并清除待确认资讯（同一次 update 内完成），同一份资讯只会被一个请求取得"""
+        taken = {}
+
+        def mutate(session: ChatSession):
+            if not session.confirm:
+                return False
+            taken.update(session.confirm)
+            session.confirm = {}
+
+        self.backend.update(emp_id, mutate)
+        return taken
+
+    def set_confirm(self, emp_id: str, data: dict):
+        def mutate(session: ChatSession):
+            session.confirm = data
+
+        self.backend.update(emp_id, mutate)
+
+    def reset_history(self, emp_id: str):
+        """清除对话轮次，保留待确认资讯"""
+        def mutate(session: ChatSession):
+            if not session.turns and not session.confirm:
+                return False  # 没有会话时不新建
+            session.turns = []
+
+        self.backend.update(emp_id, mutate)
+
+    def clear(self, emp_id: str):
+        self.backend.delete(emp_id)
+
+    def build_prompt(self, emp_id: str, system_messages: list, user_input: str) -> list:
+        """组装发送给 LLM 的消息列表：系统提示 + 压缩后的历史 + 本次输入"""
+        turns = self._get(emp_id).turns
+        recent = turns[-self.max_turns:] if self.max_turns > 0 else []
+        older = [user for user, _ in turns[:len(turns) - len(recent)]]
+
+        head = list(system_messages)
+        tail = [{"role": "user", "content": user_input}]
+        budget = self.max_prompt_tokens - sum(estimate_tokens(m["content"]) for m in head + tail)
+
+        history = []
+        for i in range(len(recent) - 1, -1, -1):
+            user, reply = recent[i]
+            cost = estimate_tokens(user) + estimate_tokens(reply)
+            if cost > budget:
+                older.extend(u for u, _ in recent[:i + 1])
+                break
+            history = [{"role": "user", "content": user}, {"role": "assistant", "content": reply}] + history
+            budget -= cost
+
+        if older:
+            summary = "用戶先前提供的資訊：" + "；".join(dict.fromkeys(older))
+            while older and estimate_tokens(summary) > budget:
+                older.pop(0)
+                summary = "用戶先前提供的資訊：" + "；".join(dict.fromkeys(older))
+            if older:
+                history.insert(0, {"role": "system", "content": summary})
+
+        messages = head + history + tail
+        tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        self.prompt_calls += 1
+        self.prompt_tokens_total += tokens
+        self.prompt_tokens_last = tokens
+        return messages
+
+    def stats(self) -> dict:
+        stats = self.backend.stats()
+        stats.update({
+            "prompt_calls": self.prompt_calls,
+            "prompt_tokens_last": self.prompt_tokens_last,
+            "prompt_tokens_avg": round(self.prompt_tokens_total / self.prompt_calls, 1) if self.prompt_calls else 0,
+        })
+        return stats
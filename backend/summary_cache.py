@@ -0,0 +1,89 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", "3600"))  # LLM 摘要缓存有效秒数
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+
+
+def record_fingerprint(emp_id: str, records, prompt_version: str, model: str) -> str:
+    """
+    以员工、每笔记录影响摘要内容的栏位、提示词版本与模型计算指纹。
+    leave_records 没有更新时间栏位，因此直接取记录内容；任何一笔新增、取消或修改都会得到新指纹。
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{prompt_version}\x1f{model}\x1f{emp_id}".encode())
+    for record in sorted(records, key=lambda r: r.id):
+        digest.update(
+            f"\x1e{record.id}\x1f{record.leave_type}\x1f{record.start_datetime}\x1f"
+            f"{record.end_datetime}\x1f{record.status}\x1f{record.total_hours}".encode()
+        )
+    return digest.hexdigest()
+
+
+class _Entry:
+    __slots__ = ("text", "prompt_chars", "created")
+
+    def __init__(self, text: str, prompt_chars: int):
+        self.text = text
+        self.prompt_chars = prompt_chars
+        self.created = time.monotonic()
+
+
+class SummaryCache:
+    """
+    LLM 摘要缓存：以记录集合指纹为键保存模型回复，请假记录没有变化时不再调用 API。
+    - 超过 ttl 秒的项目视为过期，超过 max_entries 时淘汰最久未使用的项目
+    - hits 即为省下的 API 调用次数，saved_chars 为省下的提示词与回复字元数（约略反映 token 成本）
+    """
+
+    def __init__(self, ttl: int = SUMMARY_CACHE_TTL, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_chars = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_chars += entry.prompt_chars + len(entry.text)
+                return entry.text
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, text: str, prompt_chars: int = 0):
+        with self._lock:
+            self._entries[key] = _Entry(text, prompt_chars)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "api_calls_saved": self.hits,
+                "saved_chars": self.saved_chars,
+            }
+
+
+summary_cache = SummaryCache()
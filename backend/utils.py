@@ -1,9 +1,49 @@
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
+logger = logging.getLogger("uvicorn")
+
+
+# 密码哈希配置：调整 BCRYPT_ROUNDS 后，旧成本的哈希会在用户下次登录时自动重新计算
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))  # 哈希进程池大小
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))  # 同时排队的哈希任务上限
 
 # 密码哈希上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=BCRYPT_ROUNDS,
+)
+
+# JWT 配置：多 worker 部署时必须设定 JWT_SECRET_KEY，否则各进程会各自产生随机密钥
+SECRET_KEY = os.getenv("JWT_SECRET_KEY") or secrets.token_urlsafe(32)
+if not os.getenv("JWT_SECRET_KEY") and int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+    # uvicorn 以 WEB_CONCURRENCY 作为默认 worker 数；各 worker 的随机密钥不同，token 会在其它 worker 上验证失败
+    raise RuntimeError("JWT_SECRET_KEY must be set when running multiple workers")
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "720"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))  # 缓存的已验证 token 数
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "0") == "1"  # 1: REST 与 WebSocket 都必须带 token
+
+_hash_pool = None
+_hash_slots = None
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,16 +51,165 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """验证密码；哈希成本与当前配置不同时一并返回新哈希，否则第二个返回值为 None"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _hash_pool
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+async def _run_in_hash_pool(func, *args):
+    """在专用进程池中执行 bcrypt 运算，不占用事件循环与线程池；排队任务数有上限"""
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
+    async with _hash_slots:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
+def hash_passwords(passwords: list) -> list:
+    return [hash_password(password) for password in passwords]
+
+
+def _split(items: list, parts: int) -> list:
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def hash_passwords_async(passwords: list) -> list:
+    """批量计算哈希：按进程数切分后并行执行，结果顺序与输入一致"""
+    batches = await asyncio.gather(*(_run_in_hash_pool(hash_passwords, batch)
+                                     for batch in _split(passwords, PASSWORD_HASH_WORKERS)))
+    return [hashed for batch in batches for hashed in batch]
+
+
+def hash_passwords_pooled(passwords: list) -> list:
+    """同步版本的批量哈希，供命令行工具使用"""
+    batches = _get_hash_pool().map(hash_passwords, _split(passwords, PASSWORD_HASH_WORKERS))
+    return [hashed for batch in batches for hashed in batch]
+
+
+def hash_password_pooled(password: str) -> str:
+    """供同步路由使用：在进程池中计算哈希并等待结果"""
+    return _get_hash_pool().submit(hash_password, password).result()
+
+
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    return _get_hash_pool().submit(verify_password, plain_password, hashed_password).result()
+
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """签发 JWT，默认 ACCESS_TOKEN_EXPIRE_MINUTES 分钟后过期"""
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    return jwt.encode({**data, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class TokenClaimsCache:
+    """
+    已验证 token 的 claims 缓存（LRU），以 token 的 SHA-256 为键，不保存 token 原文。
+    命中时跳过签名验证，但仍按 exp 判断是否过期。
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict):
+        with self._lock:
+            self._entries[self._key(token)] = (claims, claims.get("exp"))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenClaimsCache()
 
 
 def verify_access_token(token: str):
     """
     验证 JWT Token 并返回解码后的数据
     """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
         # 解码 Token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload  # 返回解码后的数据，通常包含用户信息
     except JWTError as e:
-        print(f"Token verification failed: {e}")
+        logger.debug("Token verification failed: %s", e)
+        return None
+    token_cache.put(token, payload)
+    return payload  # 返回解码后的数据，通常包含用户信息
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization.startswith("Bearer "):
+        return authorization[len("Bearer "):]
+    return None
+
+
+async def get_token_claims(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+    """
+    REST 路由依赖：带了 Bearer token 就必须有效；未带 token 时仅在 AUTH_REQUIRED=1 时拒绝。
+    """
+    token = bearer_token(authorization)
+    if token is None:
+        if AUTH_REQUIRED:
+            raise HTTPException(status_code=401, detail="Not authenticated")
         return None
+    claims = verify_access_token(token)
+    if not claims or "emp_id" not in claims:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return claims
+
+
+async def require_token_claims(claims: Optional[dict] = Depends(get_token_claims)) -> dict:
+    """以 token 身份执行写入的路由依赖：不论 AUTH_REQUIRED 为何都必须带有效 token"""
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return claims
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Optional
+
+import holidays
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Holiday
+
+CALENDAR_REFRESH_SECONDS = int(os.getenv("CALENDAR_REFRESH_SECONDS", "600"))  # 定期重新读取 holidays 表（秒）
+
+MAKEUP_WORKDAY_PREFIX = "補班"  # holidays 表中描述以此开头的日期视为上班日（例如周六补班）
+
+
+class _YearIndex:
+    """单一年份的工作日索引，日期以 toordinal() 整数保存为有序数组"""
+
+    def __init__(self, working: list, non_working: list, names: dict):
+        self.working = working
+        self.non_working = non_working
+        self.names = names
+
+
+class WorkCalendar:
+    """
+    工作日历：国定假日（holidays.Taiwan）加上 holidays 表中的公司调整。
+    - 每个年份只计算一次工作日/非工作日有序数组，区间查询用二分查找，复杂度 O(log n)
+    - holidays 表通过 ORM 变更并 commit 后立即失效，另外每 refresh_seconds 秒重新读取一次以同步其它进程的修改
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_seconds: int = CALENDAR_REFRESH_SECONDS):
+        self._session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._overrides = None
+        self._years = {}
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._overrides = None
+            self._years = {}
+
+    def _load_overrides(self) -> dict:
+        db = self._session_factory()
+        try:
+            rows = db.query(Holiday.holiday_date, Holiday.description).all()
+        finally:
+            db.close()
+        return {holiday_date: description for holiday_date, description in rows}
+
+    def _build(self, year: int) -> _YearIndex:
+        national = holidays.Taiwan(years=year)
+        working, non_working, names = [], [], {}
+        current = date(year, 1, 1)
+        while current.year == year:
+            override = self._overrides.get(current)
+            if override is not None and override.startswith(MAKEUP_WORKDAY_PREFIX):
+                is_working = True
+            elif override is not None:
+                is_working = False
+                names[current] = override
+            elif current in national:
+                is_working = False
+                names[current] = national.get(current)
+            else:
+                is_working = current.weekday() < 5
+            (working if is_working else non_working).append(current.toordinal())
+            current += timedelta(days=1)
+        return _YearIndex(working, non_working, names)
+
+    def _year(self, year: int) -> _YearIndex:
+        with self._lock:
+            if self._overrides is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+                self._overrides = self._load_overrides()
+                self._loaded_at = time.monotonic()
+                self._years = {}
+            index = self._years.get(year)
+            if index is None:
+                index = self._years[year] = self._build(year)
+            return index
+
+    def is_working_day(self, day: date) -> bool:
+        working = self._year(day.year).working
+        i = bisect_left(working, day.toordinal())
+        return i < len(working) and working[i] == day.toordinal()
+
+    def holiday_name(self, day: date) -> Optional[str]:
+        """假日名称；一般周末或上班日返回 None"""
+        return self._year(day.year).names.get(day)
+
+    def working_days(self, start: date, end: date) -> list:
+        """start 到 end（含）之间的所有工作日"""
+        result = []
+        for year in range(start.year, end.year + 1):
+            working = self._year(year).working
+            lo = bisect_left(working, start.toordinal())
+            hi = bisect_right(working, end.toordinal())
+            result.extend(date.fromordinal(ordinal) for ordinal in working[lo:hi])
+        return result
+
+    def working_days_between(self, start: date, end: date) -> int:
+        """start 到 end（含）之间的工作日天数"""
+        count = 0
+        for year in range(start.year, end.year + 1):
+            working = self._year(year).working
+            count += bisect_right(working, end.toordinal()) - bisect_left(working, start.toordinal())
+        return count
+
+    def first_non_working_day(self, start: date, end: date) -> Optional[date]:
+        """start 到 end（含）之间第一个非工作日，没有则返回 None"""
+        for year in range(start.year, end.year + 1):
+            non_working = self._year(year).non_working
+            i = bisect_left(non_working, start.toordinal())
+            if i < len(non_working) and non_working[i] <= end.toordinal():
+                return date.fromordinal(non_working[i])
+        return None
+
+
+work_calendar = WorkCalendar()
+
+
+# flush 时只在 session.info 记下「holidays 有变更」，等 commit 之后才失效：
+# 若在 flush 时就失效，其它请求可能在 commit 前重新读取到旧资料并缓存下来
+@event.listens_for(Session, "after_flush")
+def _mark_work_calendar_dirty(session, flush_context):
+    if any(isinstance(instance, Holiday) for instance in (*session.new, *session.dirty, *session.deleted)):
+        session.info["work_calendar_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_calendar(session):
+    if session.info.pop("work_calendar_dirty", False):
+        work_calendar.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_work_calendar_dirty(session):
+    session.info.pop("work_calendar_dirty", None)
@@ -0,0 +1,75 @@
+"""
+请假工时计算：按员工班表、午休、周末与假日计算一段请假的实际工时。
+
+多日区间不逐日遍历：首尾两天按时段重叠计算，中间整天用工作日历的区间计数乘以每日工时，
+因此任意长度的请假都是常数次计算加一次 O(log n) 的工作日查询。
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+LUNCH_START = "12:30"  # 午休开始（上午假结束时间）
+LUNCH_END = "13:30"    # 午休结束（下午假开始时间）
+
+DEFAULT_WORK_START = "09:30"
+DEFAULT_WORK_END = "18:30"
+
+Shift = namedtuple("Shift", ["start", "end", "lunch_start", "lunch_end"])
+
+
+def _to_time(value) -> time:
+    return datetime.strptime(value, "%H:%M").time() if isinstance(value, str) else value
+
+
+def make_shift(work_start=DEFAULT_WORK_START, work_end=DEFAULT_WORK_END,
+               lunch_start=LUNCH_START, lunch_end=LUNCH_END) -> Shift:
+    return Shift(_to_time(work_start or DEFAULT_WORK_START), _to_time(work_end or DEFAULT_WORK_END),
+                 _to_time(lunch_start), _to_time(lunch_end))
+
+
+def _to_hours(seconds: float) -> Decimal:
+    return Decimal(str(round(seconds / 3600, 2))).quantize(Decimal("0.01"))
+
+
+def _overlap_seconds(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datetime) -> float:
+    return max(0.0, (min(a_end, b_end) - max(a_start, b_start)).total_seconds())
+
+
+def _day_seconds(day, start: datetime, end: datetime, shift: Shift) -> float:
+    """某一天内 [start, end] 与上班时段的重叠秒数（扣除午休）"""
+    work_start, work_end = datetime.combine(day, shift.start), datetime.combine(day, shift.end)
+    worked = _overlap_seconds(start, end, work_start, work_end)
+    # 午休只在落在上班时段内的部分扣除
+    lunch = _overlap_seconds(start, end, max(work_start, datetime.combine(day, shift.lunch_start)),
+                             min(work_end, datetime.combine(day, shift.lunch_end)))
+    return worked - lunch
+
+
+def daily_hours(shift: Shift) -> Decimal:
+    """一个完整工作日的工时"""
+    day = datetime(2000, 1, 3).date()
+    seconds = _day_seconds(day, datetime.combine(day, time.min), datetime.combine(day, time.max), shift)
+    return _to_hours(seconds)
+
+
+def leave_hours(start: datetime, end: datetime, shift: Shift, calendar) -> Decimal:
+    """
+    计算 start 到 end 之间的请假工时（小时，保留两位小数）。
+    calendar 需提供 is_working_day(date) 与 working_days_between(start, end)，通常为 work_calendar。
+    """
+    if start >= end:
+        return Decimal("0.00")
+    first, last = start.date(), end.date()
+    if first == last:
+        seconds = _day_seconds(first, start, end, shift) if calendar.is_working_day(first) else 0.0
+    else:
+        seconds = 0.0
+        if calendar.is_working_day(first):
+            seconds += _day_seconds(first, start, end, shift)
+        if calendar.is_working_day(last):
+            seconds += _day_seconds(last, start, end, shift)
+        if (last - first).days > 1:
+            middle_days = calendar.working_days_between(first + timedelta(days=1), last - timedelta(days=1))
+            seconds += middle_days * _day_seconds(first, datetime.combine(first, time.min),
+                                                  datetime.combine(first, time.max), shift)
+    return _to_hours(seconds)
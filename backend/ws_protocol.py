@@ -0,0 +1,138 @@
+"""
+/ws/leave 的结构化帧协议（第 2 版）。连线时以 ?protocol=2 启用，?encoding=msgpack 改用二进制帧（默认 json）。
+
+客户端 -> 服务端：
+    {"v": 2, "id": "r1", "type": "query_leaves"}
+    {"v": 2, "id": "r2", "type": "chat", "text": "明天下午請病假"}
+  type 为 MESSAGE_TYPES 之一或 "ping"；只有 chat 会进入自然语言（LLM）流程。
+  id 由客户端产生（字符串或整数），同一连线可同时有多个处理中的请求，回复帧带相同的 id。
+
+服务端 -> 客户端：
+    {"v": 2, "id": "r2", "type": "delta", "content": "..."}     增量文本
+    {"v": 2, "id": "r2", "type": "message", "content": "..."}   一条完整回复
+    {"v": 2, "id": "r2", "type": "done"}                        该请求处理结束
+    {"v": 2, "id": "r2", "type": "error", "code": "...", "content": "..."}
+    {"v": 2, "id": null, "type": "event", "event": {...}}       推送事件（见 notifications）
+    {"v": 2, "id": "r3", "type": "pong"}
+
+第 2 版必须以 token 认证，不支持消息中的 @@emp_id@@ 标记。未带 protocol 参数的连线仍使用旧的纯文字协议。
+"""
+import json
+from typing import Optional, Union
+
+PROTOCOL_VERSION = 2
+
+# 消息类型 -> 说明；旧版纯文字消息按关键词对应到这些类型
+MESSAGE_TYPES = {
+    "chat": "自然语言请假申请（LLM）",
+    "query_leaves": "查询本人请假记录摘要",
+    "cancel_leave": "列出本人请假记录以选择要取消的一笔",
+    "confirm_leave": "确认并提出待确认的请假",
+    "pending_approvals": "主管查询下属待审核的申请",
+    "approve_all": "主管核准所有下属待审核的申请",
+}
+
+
+class ProtocolError(Exception):
+    def __init__(self, code: str, message: str, request_id=None):
+        super().__init__(message)
+        self.code = code
+        self.request_id = request_id
+
+
+class JsonCodec:
+    name = "json"
+    binary = False
+
+    def encode(self, frame: dict) -> str:
+        return json.dumps(frame, ensure_ascii=False, default=str)
+
+    def decode(self, data: Union[str, bytes]) -> object:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """需安装 msgpack 套件"""
+
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def encode(self, frame: dict) -> bytes:
+        return self._msgpack.packb(frame, use_bin_type=True, default=str)
+
+    def decode(self, data: Union[str, bytes]) -> object:
+        if isinstance(data, str):
+            raise ValueError("msgpack frames must be binary")
+        return self._msgpack.unpackb(data, raw=False)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def get_codec(name: str):
+    """返回编码器实例；名称未知或所需套件未安装时返回 None"""
+    codec_class = CODECS.get(name)
+    if codec_class is None:
+        return None
+    try:
+        return codec_class()
+    except ImportError:
+        return None
+
+
+class Frame:
+    __slots__ = ("id", "type", "text")
+
+    def __init__(self, request_id, message_type: str, text: Optional[str]):
+        self.id = request_id
+        self.type = message_type
+        self.text = text
+
+
+def parse_frame(codec, data: Union[str, bytes]) -> Frame:
+    """解码并检查一个客户端帧，格式不符时抛出 ProtocolError"""
+    try:
+        frame = codec.decode(data)
+    except ValueError as e:
+        raise ProtocolError("bad_frame", f"Cannot decode {codec.name} frame: {e}")
+    if not isinstance(frame, dict):
+        raise ProtocolError("bad_frame", "Frame must be an object")
+
+    request_id = frame.get("id")
+    if request_id is not None and not isinstance(request_id, (str, int)):
+        raise ProtocolError("bad_frame", "id must be a string or integer")
+    if frame.get("v") != PROTOCOL_VERSION:
+        raise ProtocolError("unsupported_version", f"Expected v={PROTOCOL_VERSION}", request_id)
+
+    message_type = frame.get("type")
+    if message_type != "ping" and message_type not in MESSAGE_TYPES:
+        raise ProtocolError("unknown_type", f"Unknown type: {message_type}", request_id)
+
+    text = frame.get("text")
+    if message_type == "chat" and (not isinstance(text, str) or not text.strip()):
+        raise ProtocolError("bad_frame", "chat requires a non-empty text", request_id)
+    return Frame(request_id, message_type, text)
+
+
+def classify_text(user_input: str) -> str:
+    """旧版纯文字协议：按关键词判断消息类型，判断顺序与原先的 if/elif 相同"""
+    if "***" in user_input:
+        return "pending_approvals"
+    if "請假" in user_input:
+        if "查詢" in user_input:
+            return "query_leaves"
+        if "確認" in user_input:
+            return "confirm_leave"
+        if "同意" in user_input:
+            return "approve_all"
+        if "取消" in user_input:
+            return "cancel_leave"
+    return "chat"
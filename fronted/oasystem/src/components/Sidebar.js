@@ -24,7 +24,7 @@ const Sidebar = () => {
 
   const handleLogout = () => {
     // 清除認證信息
-    localStorage.removeItem("authToken");
+    localStorage.removeItem("token");
 
     // 導向登入頁面
     history.push("/login");
@@ -11,6 +11,7 @@ export const AuthProvider = ({ children }) => {
   const login = async (email, password) => {
     try {
       const response =  await authAPI.login(email,password); 
+      localStorage.setItem('token', response.data.access_token);
       setUser(response.data);
       setIsAuthenticated(true);
       return true;
@@ -21,6 +22,7 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    localStorage.removeItem('token');
     setUser(null);
     setIsAuthenticated(false);
   };
@@ -12,8 +12,8 @@ const Dashboard = () => {
   const history = useHistory();
 
   const handleLogout = () => {
-    // 您可以在这里添加任何登出逻辑，例如清除本地存储的令牌
-    localStorage.removeItem("authToken"); // 假设您使用authToken存储认证信息
+    // 清除認證信息（與 AuthContext 相同，token 存放在 "token"）
+    localStorage.removeItem("token");
 
     // 重定向到登录页面
     history.push("/login");
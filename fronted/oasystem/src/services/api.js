@@ -25,6 +25,21 @@ apiClient.interceptors.request.use(
   }
 );
 
+// 回應攔截器 - token 失效或過期時清除並導向登入頁
+apiClient.interceptors.response.use(
+  (response) => response,
+  (error) => {
+    const isLogin = error.config && error.config.url === '/auth/login';
+    if (error.response && error.response.status === 401 && !isLogin) {
+      localStorage.removeItem('token');
+      if (window.location.pathname !== '/login') {
+        window.location.assign('/login');
+      }
+    }
+    return Promise.reject(error);
+  }
+);
+
 // Auth API
 export const authAPI = {
   login: (email, password) => {
@@ -72,7 +87,10 @@ export const employeeAPI = {
 
 // WebSocket Service
 export const createWebSocket = (path) => {
-  return new WebSocket(`ws://${BASE_URL.replace('http://', '')}${path}`);
+  // 瀏覽器的 WebSocket 無法設定 Authorization 標頭，改以查詢參數帶 token
+  const token = localStorage.getItem('token');
+  const query = token ? `${path.includes('?') ? '&' : '?'}token=${encodeURIComponent(token)}` : '';
+  return new WebSocket(`ws://${BASE_URL.replace('http://', '')}${path}${query}`);
 };
 
 
@@ -5,6 +5,23 @@ VENV_PATH="/home/oa/backend/venv"
 SERVER_PATH="/home/oa/backend"
 PID_FILE="/home/oa/scripts/uvicorn.pid"
 LOG_PATH="/home/oa/backend/log_config.yaml"
+WORKERS="${WORKERS:-1}"
+
+# 多 worker 时对话状态需放在跨进程共享的存储中，JWT 密钥与推送频道也必须各进程共用
+if [ "$WORKERS" -gt 1 ]; then
+  export CHAT_SESSION_BACKEND="${CHAT_SESSION_BACKEND:-sqlite}"
+  export CHAT_SESSION_DB="${CHAT_SESSION_DB:-$SERVER_PATH/chat_sessions.db}"
+  export NOTIFY_BACKEND="${NOTIFY_BACKEND:-redis}"
+  if [ -z "$JWT_SECRET_KEY" ]; then
+    echo "JWT_SECRET_KEY must be set when WORKERS > 1, otherwise tokens issued by one worker are rejected by the others"
+    exit 1
+  fi
+  if [ "$NOTIFY_BACKEND" != "redis" ]; then
+    echo "NOTIFY_BACKEND must be redis when WORKERS > 1, otherwise push events only reach one worker's connections"
+    exit 1
+  fi
+fi
+export WEB_CONCURRENCY="$WORKERS"
 
 # 激活虚拟环境
 if [ -d "$VENV_PATH" ]; then
@@ -24,7 +41,7 @@ fi
 cd $SERVER_PATH
 
 # 启动 Uvicorn
-uvicorn main:app --host 0.0.0.0 --port 39200 --log-config  $LOG_PATH &
+uvicorn main:app --host 0.0.0.0 --port 39200 --workers $WORKERS --log-config  $LOG_PATH &
 echo $! > "$PID_FILE"
 echo "Uvicorn started (PID: $!)"
 